@@ -0,0 +1,85 @@
+"""
+Benchmark for the category aggregation: compares the single grouped pass in aggregate.py against the original per-category loop.
+Usage: python benchmarks/bench_aggregate.py [--rows 5000000] [--categories 100]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from aggregate import aggregate_categories, build_cube, rollup
+
+
+def make_inventory(rows, categories, seed=0):
+    """
+    Returns a synthetic inventory after unit conversion, with the given number of rows and categories
+    Input: the number of rows, the number of categories and a random seed
+    """
+    rng = np.random.default_rng(seed)
+    names = np.array([f'Category {i}' for i in range(categories)], dtype=object)
+    months = pd.date_range('2024-01-01', periods=12, freq='MS').strftime('%Y-%m-%d').to_numpy(dtype=object)
+    return pd.DataFrame({
+        'category': names[rng.integers(0, categories, rows)],
+        'store': rng.integers(0, 20, rows),
+        'our_price': rng.uniform(5, 20, rows).round(2),
+        'weight_per_restock': rng.uniform(1, 30, rows),
+        'restock_date': months[rng.integers(0, len(months), rows)],
+    })
+
+
+def legacy_aggregate_categories(inventory_df):
+    """
+    The original per-category loop from analysis.py, kept as the benchmark baseline
+    Input: the inventory DataFrame after unit conversion
+    """
+    categories = inventory_df['category'].unique()
+    keys = ['Category', 'Number of Products', 'Total Price', 'Total Quantity', 'Price Per Pound']
+    inventory_categories_dict = dict(zip(keys, ([] for _ in keys)))
+    for category in categories:
+        category_total_price = inventory_df[inventory_df['category']==str(category)]['our_price'].sum()
+        category_total_pounds = inventory_df[inventory_df['category']==str(category)]['weight_per_restock'].sum()
+        inventory_categories_dict['Category'].append(category)
+        inventory_categories_dict['Number of Products'].append(inventory_df['category'].value_counts().get(str(category), 0))
+        inventory_categories_dict['Total Price'].append(category_total_price)
+        inventory_categories_dict['Total Quantity'].append(category_total_pounds)
+        inventory_categories_dict['Price Per Pound'].append(category_total_price/category_total_pounds)
+    return pd.DataFrame({key: pd.Series(value) for key, value in inventory_categories_dict.items()})
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=5_000_000)
+    parser.add_argument('--categories', type=int, default=100)
+    args = parser.parse_args()
+
+    inventory_df = make_inventory(args.rows, args.categories)
+    legacy_df, legacy_time = timed(legacy_aggregate_categories, inventory_df)
+    grouped_df, grouped_time = timed(aggregate_categories, inventory_df)
+    pd.testing.assert_frame_equal(grouped_df, legacy_df, check_dtype=False)
+
+    cube, cube_time = timed(build_cube, inventory_df, ['category', 'store', 'restock_month'])
+    rolled_df, rollup_time = timed(rollup, cube, ['category'])
+    pd.testing.assert_frame_equal(rolled_df.reset_index(drop=True), legacy_df.drop(columns='Category'), check_dtype=False)
+
+    print(f'{args.rows:,} rows x {args.categories} categories')
+    print('| Method | Time (s) |')
+    print('| --- | ---: |')
+    print(f'| Per-category loop | {legacy_time:.3f} |')
+    print(f'| aggregate_categories() | {grouped_time:.3f} |')
+    print(f'| build_cube() over category, store, restock_month ({len(cube):,} cells) | {cube_time:.3f} |')
+    print(f'| rollup() of the cube to category | {rollup_time:.4f} |')
+    print(f'Speedup of the grouped pass over the loop: {legacy_time / grouped_time:,.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark for CSV ingestion: reports wall time and peak RSS of the in-memory, chunked and streaming-totals modes.
+Each mode runs in its own process so that peak RSS is not shared between them.
+Usage: python benchmarks/bench_ingest.py [--rows 2000000] [--chunksize 100000]
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from ingest import load_inventory, load_inventory_chunked, stream_totals
+from report import plain
+
+SAMPLE_CSV = os.path.join(os.path.dirname(__file__), '..', 'data', 'products.csv')
+MODES = ['memory', 'chunked', 'stream']
+
+
+def write_inventory_csv(path, rows, seed=0):
+    """
+    Writes a synthetic inventory CSV by sampling rows of data/products.csv, keeping its dirty values
+    Input: the output path, the number of rows and a random seed
+    """
+    sample_df = pd.read_csv(SAMPLE_CSV, dtype='str')
+    rng = np.random.default_rng(seed)
+    sample_df.iloc[rng.integers(0, len(sample_df), rows)].to_csv(path, index=False)
+
+
+def check_parity(csv_path, chunksize=3):
+    """
+    Checks that the chunked path returns the same values as the in-memory path, and that every cell prints the same in the report
+    Input: the path of an inventory CSV and a chunk size small enough to split it into several chunks
+    """
+    memory_df = load_inventory(csv_path)
+    chunked_df = load_inventory_chunked(csv_path, chunksize)
+    # The chunked path stores category as a categorical and whole numbers in narrower integers, so compare values rather than dtypes
+    pd.testing.assert_frame_equal(memory_df, chunked_df, check_dtype=False, check_categorical=False, check_exact=True)
+    for column in memory_df.columns:
+        assert plain(memory_df[column]).equals(plain(chunked_df[column])), f'{column} prints differently when read in chunks'
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_mode(mode, csv_path, chunksize):
+    start = time.perf_counter()
+    if mode == 'memory':
+        rows = len(load_inventory(csv_path))
+    elif mode == 'chunked':
+        rows = len(load_inventory_chunked(csv_path, chunksize))
+    else:
+        rows = stream_totals(csv_path, chunksize)['rows']
+    elapsed = time.perf_counter() - start
+    print(f'{mode},{rows},{elapsed:.3f},{peak_rss_mb():.1f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    parser.add_argument('--mode', choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument('--csv', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.csv, args.chunksize)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # The chunked path must match the in-memory path exactly: on the sample, on a file with fractional thresholds
+        # and on a file with only whole numbers, where both paths hold the numeric columns as integers
+        check_parity(SAMPLE_CSV)
+        sample_df = pd.read_csv(SAMPLE_CSV, dtype='str')
+        fractional_path = os.path.join(tmp_dir, 'fractional.csv')
+        sample_df.assign(restock_threshold=sample_df['restock_threshold'].where(sample_df.index % 2 == 0, '12.5')).to_csv(fractional_path, index=False)
+        check_parity(fractional_path)
+        whole_path = os.path.join(tmp_dir, 'whole.csv')
+        sample_df.assign(our_price='9', current_stock='40', restock_threshold='20').to_csv(whole_path, index=False)
+        check_parity(whole_path)
+
+        csv_path = os.path.join(tmp_dir, 'inventory.csv')
+        write_inventory_csv(csv_path, args.rows)
+        print('| Mode | Rows | Wall time (s) | Peak RSS (MB) |')
+        print('| --- | ---: | ---: | ---: |')
+        for mode in MODES:
+            output = subprocess.run(
+                [sys.executable, __file__, '--mode', mode, '--csv', csv_path, '--chunksize', str(args.chunksize)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            mode, rows, elapsed, peak = output.strip().splitlines()[-1].split(',')
+            print(f'| {mode} | {int(rows):,} | {elapsed} | {peak} |')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark for start-up cost: reports the import time of analysis.py (as measured by python -X importtime) against the
+libraries the script used to import eagerly, and the time to analyse many small store files with one process per file
+versus back-to-back in one warm process.
+Usage: python benchmarks/bench_startup.py [--stores 20]
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, SRC_DIR)
+from cache import cache_paths
+from fetch import load_series
+
+SAMPLE_CSV = os.path.join(os.path.dirname(__file__), '..', 'data', 'products.csv')
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'beverage-materials-including-coffee-and-tea.html')
+# What the single-file script imported at start-up before the stages were split out
+EAGER_IMPORTS = ['bs4', 'matplotlib.pyplot', 'numpy', 'pandas', 'requests']
+
+
+def import_time_ms(statement):
+    """
+    Returns the total time in milliseconds that python -X importtime reports for the top-level imports of a statement
+    Input: the Python statement to run
+    """
+    output = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                            cwd=SRC_DIR, check=True, capture_output=True, text=True).stderr
+    total = 0
+    for line in output.splitlines():
+        # Lines look like "import time:   self [us] | cumulative | imported package"; top-level imports are not indented
+        if line.startswith('import time:') and '|' in line:
+            _, cumulative, name = line.split('|')
+            if cumulative.strip().isdigit() and not name.startswith('  '):
+                total += int(cumulative)
+    return total / 1000
+
+
+def seed_cache(cache_dir):
+    # Serve every configured series from the fixture page, so the runs below never touch the network
+    with open(FIXTURE, encoding='utf-8') as f:
+        html = f.read()
+    os.makedirs(cache_dir, exist_ok=True)
+    for url in load_series().values():
+        paths = cache_paths(url, cache_dir)
+        with open(paths['html'], 'w', encoding='utf-8') as f:
+            f.write(html)
+        with open(paths['meta'], 'w') as f:
+            json.dump({'url': url, 'fetched_at': time.time(), 'etag': None, 'last_modified': None,
+                       'digest': hashlib.sha256(html.encode('utf-8')).hexdigest()}, f)
+
+
+def timed_run(command, env):
+    start = time.perf_counter()
+    subprocess.run(command, check=True, capture_output=True, env=env)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--stores', type=int, default=20, help='number of small store files to analyse')
+    args = parser.parse_args()
+
+    available = [name for name in EAGER_IMPORTS
+                 if subprocess.run([sys.executable, '-c', f'import {name}'], capture_output=True).returncode == 0]
+    print('| Start-up | Import time (ms) |')
+    print('| --- | ---: |')
+    print(f'| import {", ".join(available)} (previous eager imports) | {import_time_ms("import " + ", ".join(available)):,.1f} |')
+    print(f'| import analysis | {import_time_ms("import analysis"):,.1f} |')
+    print()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache_dir = os.path.join(tmp_dir, 'cache')
+        seed_cache(cache_dir)
+        env = dict(os.environ, ANALYSIS_CACHE_DIR=cache_dir, ANALYSIS_OFFLINE='1')
+
+        store_paths = []
+        for store in range(args.stores):
+            store_path = os.path.join(tmp_dir, f'store{store}.csv')
+            shutil.copy(SAMPLE_CSV, store_path)
+            store_paths.append(store_path)
+        script = os.path.join(SRC_DIR, 'analysis.py')
+
+        # One interpreter per store file, as a shell loop would run them
+        cold_time = sum(timed_run([sys.executable, script, store_path, '--report', os.path.join(tmp_dir, 'cold.md')], env)
+                        for store_path in store_paths)
+        # All store files in one interpreter, so the imports are paid for once. Each file still reads the price series back from the on-disk cache.
+        warm_time = timed_run([sys.executable, script, *store_paths, '--report', os.path.join(tmp_dir, 'warm.md')], env)
+
+    print(f'| {args.stores} store files | Total (s) | Per file (ms) |')
+    print('| --- | ---: | ---: |')
+    print(f'| One process per file | {cold_time:,.2f} | {cold_time / args.stores * 1000:,.0f} |')
+    print(f'| One warm process | {warm_time:,.2f} | {warm_time / args.stores * 1000:,.0f} |')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark for the price table extraction: compares the lxml parser in tables.py against the original BeautifulSoup path.
+The pages in benchmarks/fixtures are parsed repeatedly and the mean time per page is reported.
+Usage: python benchmarks/bench_tables.py [--repeat 50] [fixture.html ...]
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+from bs4 import BeautifulSoup
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from tables import PRICE_TABLE_COLUMNS, parse_price_table
+from utils import extract_column_from_header
+
+FIXTURES = sorted(glob.glob(os.path.join(os.path.dirname(__file__), 'fixtures', '*.html')))
+
+
+def legacy_parse_price_table(html):
+    """
+    The original BeautifulSoup parsing from analysis.py, kept as the benchmark baseline
+    Input: the HTML of the page
+    """
+    # Use BeautifulSoup() to create a BeautifulSoup object from a response text content
+    in2013dollars_soup = BeautifulSoup(html, 'html.parser')
+
+    # Use the find_all function in the BeautifulSoup object with the element type of 'table', then assign the result to a list called 'html_tables'
+    html_tables = in2013dollars_soup.find_all('table')
+    in2013dollars_table = html_tables[0]
+
+    column_names = []
+
+    # Apply the find_all() function with 'th' element on products_table
+    # Iterate each th element and apply the provided extract_column_from_header() to get a column name
+    # Append the Non-empty column name (`if name is not None and len(name) > 0`) into a list called column_names
+    column_headers = in2013dollars_table.find_all('th')
+    for row in column_headers:
+        name = extract_column_from_header(row)
+        if name is not None and len(name) > 0:
+            column_names.append(name)
+
+    # print(column_names)
+
+    # We will create an empty dictionary with keys from the extracted column names. We can then convert this into a Pandas dataframe
+    in2013dollars_dict= dict.fromkeys(column_names)
+
+    # Initialize the in2013dollars_dict with each value to be an empty list
+    in2013dollars_dict['Year'] = []
+    in2013dollars_dict['U.S.D. Value'] = []
+    in2013dollars_dict['Inflation Rate'] = []
+
+    for rows in in2013dollars_table.find_all("tr"):
+        if rows.th:
+            flag = False
+        else:
+            flag = True
+        row=rows.find_all('td')
+        # print(row)
+
+        if flag:
+            year=row[0].get_text()
+            # print(crop)
+            in2013dollars_dict['Year'].append(int(year))
+
+            value=row[1].get_text()
+            # print(global_gpv)
+            value_num = value.strip('$')
+            in2013dollars_dict['U.S.D. Value'].append(float(value_num))
+
+            inflation_rate = row[2].get_text()
+            # print(global_prod)
+            inflation_rate_num = inflation_rate.replace('%','').replace('*','')
+            if any(chr.isdigit() for chr in inflation_rate_num):
+                in2013dollars_dict['Inflation Rate'].append(float(inflation_rate_num))
+            else: #To cover the null value for this column in 1997
+                in2013dollars_dict['Inflation Rate'].append(0.0)
+
+    return pd.DataFrame({ key:pd.Series(value) for key, value in in2013dollars_dict.items() })
+
+
+def time_per_page(parse, html, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        parse(html)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('pages', nargs='*', default=FIXTURES)
+    args = parser.parse_args()
+
+    print('| Page | Size (KB) | BeautifulSoup (ms) | lxml (ms) | Speedup |')
+    print('| --- | ---: | ---: | ---: | ---: |')
+    for path in args.pages:
+        with open(path, encoding='utf-8') as f:
+            html = f.read()
+
+        # Both paths must agree on the columns used downstream
+        pd.testing.assert_frame_equal(parse_price_table(html), legacy_parse_price_table(html)[PRICE_TABLE_COLUMNS])
+
+        legacy_time = time_per_page(legacy_parse_price_table, html, args.repeat)
+        lxml_time = time_per_page(parse_price_table, html, args.repeat)
+        print(f'| {os.path.basename(path)} | {len(html) / 1024:,.1f} | {legacy_time * 1000:,.2f} | {lxml_time * 1000:,.2f} | {legacy_time / lxml_time:,.1f}x |')
+
+
+if __name__ == '__main__':
+    main()
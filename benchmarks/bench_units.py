@@ -0,0 +1,101 @@
+"""
+Benchmark for the unit conversion stage: compares the vectorized convert_units() against the original iterrows() loop.
+Usage: python benchmarks/bench_units.py [--sizes 10000 1000000 10000000] [--loop-max 1000000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from units import convert_units, load_unit_table
+
+SAMPLE_NAMES = [
+    'Organic Coffee Beans (1lb)', 'Premium Green Tea (50 bags)', 'Masala Chai Mix (12oz)',
+    'Yerba Mate Loose Leaf (1lb)', 'Hot Chocolate Mix (1lb)', 'Earl Grey Tea (100 bags)',
+    'Espresso Beans (1lb)', 'Chamomile Tea (30 bags)', 'Matcha Green Tea Powder (4oz)',
+    'Decaf Coffee Beans (1lb)', 'Mint Tea (25 bags)', 'Instant Coffee (8oz)',
+    'Rooibos Tea (40 bags)', 'cold brew concentrate',
+]
+
+
+def make_inventory(rows, seed=0):
+    """
+    Returns a synthetic cleaned inventory with the given number of rows
+    Input: the number of rows and a random seed
+    """
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'product_name': np.array(SAMPLE_NAMES, dtype=object)[rng.integers(0, len(SAMPLE_NAMES), rows)],
+        'our_price': rng.uniform(5, 20, rows).round(2),
+        'restock_threshold': rng.integers(5, 30, rows).astype('float64'),
+    })
+
+
+def legacy_convert_units(inventory_df):
+    """
+    The original iterrows() conversion loop from analysis.py, kept as the benchmark baseline
+    Input: the cleaned inventory DataFrame
+    """
+    inventory_df['unit_number'] = inventory_df['product_name'].str.extract(r'(\d+)')
+    inventory_df['pounds_per_unit'] = np.nan
+    inventory_df['earnings_per_restock'] = np.nan
+    inventory_df['weight_per_restock'] = np.nan
+
+    for index, row in inventory_df.iterrows():
+        r1 = row['unit_number']
+        price = row['our_price']
+        stock = row['restock_threshold']
+        r2 = 1.0
+        if r1:
+            if 'lb' in row['product_name']:
+                r2 = float(r1)
+            elif 'oz' in row['product_name']:
+                r2 = float(r1)/16
+            elif 'bags' in row['product_name']:
+                r2 = float(r1)/200
+
+        inventory_df.at[index, 'pounds_per_unit'] = r2
+        inventory_df.at[index, 'earnings_per_restock'] = price * stock
+        inventory_df.at[index, 'weight_per_restock'] = r2 * stock
+
+    return inventory_df
+
+
+def time_rows_per_sec(func, inventory_df):
+    start = time.perf_counter()
+    func(inventory_df)
+    elapsed = time.perf_counter() - start
+    return len(inventory_df) / elapsed, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument('--loop-max', type=int, default=1_000_000,
+                        help='largest size to run the iterrows() loop on (it takes minutes at 10M rows)')
+    args = parser.parse_args()
+
+    unit_table = load_unit_table()
+    print('| Rows | iterrows() loop (rows/s) | convert_units() (rows/s) | Speedup |')
+    print('| ---: | ---: | ---: | ---: |')
+    for size in args.sizes:
+        inventory_df = make_inventory(size)
+        vector_rate, _ = time_rows_per_sec(lambda df: convert_units(df, unit_table), inventory_df.copy())
+        if size <= args.loop_max:
+            loop_df = inventory_df.copy()
+            loop_rate, _ = time_rows_per_sec(legacy_convert_units, loop_df)
+            # Both paths must agree on the columns used downstream
+            vector_df = convert_units(inventory_df.copy(), unit_table)
+            for column in ['pounds_per_unit', 'earnings_per_restock', 'weight_per_restock']:
+                pd.testing.assert_series_equal(vector_df[column], loop_df[column], check_exact=True)
+            print(f'| {size:,} | {loop_rate:,.0f} | {vector_rate:,.0f} | {vector_rate / loop_rate:,.1f}x |')
+        else:
+            print(f'| {size:,} | skipped (--loop-max) | {vector_rate:,.0f} | - |')
+
+
+if __name__ == '__main__':
+    main()
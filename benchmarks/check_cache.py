@@ -0,0 +1,88 @@
+"""
+Checks the on-disk page cache in src/cache.py against a local stand-in server (see mock_server.py): the first fetch,
+reuse within the TTL, revalidation with ETag and with Last-Modified, the stale copy used when the server is down,
+and offline mode. Exits with an AssertionError if any check fails.
+Usage: python benchmarks/check_cache.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from cache import cache_paths, fetch_frame, fetch_html, make_session, read_json
+from mock_server import MockSite
+from tables import parse_price_table
+
+PATH = '/Beverage-materials-including-coffee-and-tea/price-inflation'
+
+
+def check(name, condition):
+    assert condition, name
+    print(f'ok - {name}')
+
+
+def main():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # No retries, so that the checks against a stopped server do not wait for backoff
+        session = make_session(retries=0)
+
+        with MockSite() as site:
+            url = site.url(PATH)
+            html, digest = fetch_html(url, cache_dir=cache_dir, session=session)
+            check('the first fetch requests the page', site.statuses(PATH) == [200] and html == site.html)
+            check('the page and its metadata are cached', all(os.path.exists(path) for path in list(cache_paths(url, cache_dir).values())[:2]))
+
+            fetch_html(url, cache_dir=cache_dir, session=session)
+            check('a copy younger than the TTL is used without a request', site.statuses(PATH) == [200])
+
+            fetched_at = read_json(cache_paths(url, cache_dir)['meta'])['fetched_at']
+            time.sleep(0.01)
+            revalidated_html, revalidated_digest = fetch_html(url, cache_dir=cache_dir, ttl=0, session=session)
+            check('a stale copy is revalidated with If-None-Match and the server answers 304', site.statuses(PATH) == [200, 304])
+            check('a 304 returns the cached page', (revalidated_html, revalidated_digest) == (html, digest))
+            check('a 304 restarts the TTL', read_json(cache_paths(url, cache_dir)['meta'])['fetched_at'] > fetched_at)
+
+            fetch_html(url, cache_dir=cache_dir, ttl=0, offline=True, session=session)
+            check('offline mode uses a stale copy without a request', site.statuses(PATH) == [200, 304])
+            try:
+                fetch_html(site.url('/never-fetched'), cache_dir=cache_dir, offline=True, session=session)
+                check('offline mode refuses a page that is not cached', False)
+            except RuntimeError:
+                check('offline mode refuses a page that is not cached', site.statuses('/never-fetched') == [])
+
+        with MockSite(etag=None) as site:
+            url = site.url(PATH)
+            fetch_html(url, cache_dir=cache_dir, session=session)
+            fetch_html(url, cache_dir=cache_dir, ttl=0, session=session)
+            check('without an ETag, a stale copy is revalidated with If-Modified-Since', site.statuses(PATH) == [200, 304])
+
+        # The server is stopped now, so every request fails to connect
+        stale_html, _ = fetch_html(url, cache_dir=cache_dir, ttl=0, session=session)
+        check('the stale copy is used when the server cannot be reached', stale_html == html)
+        try:
+            fetch_html(site.url('/never-fetched'), cache_dir=cache_dir, session=session)
+            check('an error is raised when the server cannot be reached and nothing is cached', False)
+        except requests.ConnectionError:
+            check('an error is raised when the server cannot be reached and nothing is cached', True)
+
+        with MockSite() as site:
+            url = site.url(PATH)
+            calls = []
+
+            def counting_parse(html):
+                calls.append(html)
+                return parse_price_table(html)
+
+            first_df = fetch_frame(url, counting_parse, cache_dir=cache_dir, session=session)
+            cached_df = fetch_frame(url, counting_parse, cache_dir=cache_dir, ttl=0, session=session)
+            check('the parsed DataFrame is reused while the page content is unchanged', len(calls) == 1 and site.statuses(PATH) == [200, 304])
+            pd.testing.assert_frame_equal(first_df, cached_df, check_exact=True)
+            check('the cached DataFrame reads back with the same values and dtypes', True)
+
+
+if __name__ == '__main__':
+    main()
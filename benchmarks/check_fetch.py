@@ -0,0 +1,85 @@
+"""
+Checks fetch_series() in src/fetch.py against a local stand-in server (see mock_server.py) that delays each response:
+the series are fetched concurrently, the table keeps the order the series were given in, errors='skip' and errors='raise'
+behave as documented, and a slow server is cut off by the per-request timeout. Exits with an AssertionError if any check fails.
+Usage: python benchmarks/check_fetch.py [--delay 0.5]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from cache import make_session
+from fetch import fetch_series
+from mock_server import MockSite
+
+SERIES_PATHS = {
+    'Beverage materials including coffee and tea': '/Beverage-materials-including-coffee-and-tea/price-inflation',
+    'Coffee': '/Coffee/price-inflation',
+    'Tea': '/Tea/price-inflation',
+    'Dairy': '/Dairy-and-related-products/price-inflation',
+}
+
+
+def check(name, condition):
+    assert condition, name
+    print(f'ok - {name}')
+
+
+def timed_fetch(series, **options):
+    # A fresh cache directory for every call, so each series is requested from the server
+    with tempfile.TemporaryDirectory() as cache_dir:
+        start = time.perf_counter()
+        price_series_df = fetch_series(series, cache_dir=cache_dir, **options)
+        return price_series_df, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--delay', type=float, default=0.5, help='seconds the server waits before answering each series')
+    args = parser.parse_args()
+
+    # The first series is the slowest, so it finishes last if the requests really run at the same time
+    paths = list(SERIES_PATHS.values())
+    delays = {path: args.delay * (len(paths) - index) for index, path in enumerate(paths)}
+    with MockSite(delays=delays, missing=['/Missing/price-inflation']) as site:
+        series = {name: site.url(path) for name, path in SERIES_PATHS.items()}
+
+        price_series_df, elapsed = timed_fetch(series, max_workers=len(series))
+        print(f'{len(series)} series with delays totalling {sum(delays.values()):.1f} s fetched in {elapsed:.2f} s')
+        check('the series are fetched concurrently', elapsed < sum(delays.values()) * 0.6)
+        check('the table follows the order the series were given in', list(price_series_df['Series'].unique()) == list(series))
+        check('every series holds the whole price table', price_series_df.groupby('Series').size().nunique() == 1)
+
+        series_with_missing = {**series, 'Missing': site.url('/Missing/price-inflation')}
+        price_series_df, _ = timed_fetch(series_with_missing, max_workers=len(series_with_missing), errors='skip')
+        check("errors='skip' drops the series that failed and keeps the others", list(price_series_df['Series'].unique()) == list(series))
+        try:
+            timed_fetch(series_with_missing, max_workers=len(series_with_missing), errors='raise')
+            check("errors='raise' raises the error of the series that failed", False)
+        except requests.HTTPError as error:
+            check("errors='raise' raises the error of the series that failed", error.response.status_code == 404)
+
+    # One series much slower than the timeout. Without retries, the request is given up after one timeout.
+    timeout = 0.3
+    with MockSite(delays={'/Slow/price-inflation': 3}) as site:
+        session = make_session(retries=0)
+        slow_series = {'Coffee': site.url('/Coffee/price-inflation'), 'Slow': site.url('/Slow/price-inflation')}
+        start = time.perf_counter()
+        try:
+            timed_fetch(slow_series, timeout=timeout, session=session)
+            check('a request slower than the timeout raises', False)
+        except requests.RequestException as error:
+            # With a retry policy on the session, requests reports a read timeout as a ConnectionError rather than a Timeout
+            check('a request slower than the timeout raises', 'timed out' in str(error) and time.perf_counter() - start < 3 * timeout)
+        price_series_df, elapsed = timed_fetch(slow_series, timeout=timeout, session=session, errors='skip')
+        check("with errors='skip', a request slower than the timeout is skipped",
+              list(price_series_df['Series'].unique()) == ['Coffee'] and elapsed < 3 * timeout)
+
+
+if __name__ == '__main__':
+    main()
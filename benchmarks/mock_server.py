@@ -0,0 +1,82 @@
+"""
+A local stand-in for in2013dollars.com, used by check_cache.py and check_fetch.py so that neither touches the network.
+It serves the fixture page at every path on 127.0.0.1, with an optional delay per path, ETag and Last-Modified headers,
+and 404 for the paths listed as missing. Every request is logged as (path, status).
+"""
+import http.server
+import os
+import threading
+import time
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'beverage-materials-including-coffee-and-tea.html')
+LAST_MODIFIED = 'Wed, 01 Jan 2025 00:00:00 GMT'
+
+
+def read_fixture():
+    with open(FIXTURE, encoding='utf-8') as f:
+        return f.read()
+
+
+class MockSite:
+    """
+    Runs the local server in a background thread for the duration of a with-block
+    Input: the HTML to serve, a dict of path to delay in seconds, the paths to answer with 404, and the ETag to send (None sends none)
+    """
+
+    def __init__(self, html=None, delays=None, missing=(), etag='"v1"'):
+        self.html = read_fixture() if html is None else html
+        self.delays = dict(delays or {})
+        self.missing = set(missing)
+        self.etag = etag
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        site = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                time.sleep(site.delays.get(self.path, 0))
+                if self.path in site.missing:
+                    status = 404
+                elif site.etag is not None and self.headers.get('If-None-Match') == site.etag:
+                    status = 304
+                elif site.etag is None and self.headers.get('If-Modified-Since') == LAST_MODIFIED:
+                    status = 304
+                else:
+                    status = 200
+                with site.lock:
+                    site.requests.append((self.path, status))
+
+                body = site.html.encode('utf-8') if status == 200 else b''
+                try:
+                    self.send_response(status)
+                    if site.etag is not None:
+                        self.send_header('ETag', site.etag)
+                    self.send_header('Last-Modified', LAST_MODIFIED)
+                    self.send_header('Content-Type', 'text/html; charset=utf-8')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client gave up waiting, e.g. when checking timeouts
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def url(self, path):
+        return f'http://127.0.0.1:{self.server.server_address[1]}{path}'
+
+    def statuses(self, path):
+        with self.lock:
+            return [status for request_path, status in self.requests if request_path == path]
@@ -0,0 +1,50 @@
+# Measures kept for every cell of the cube. Price per pound is derived from the totals, so it can be recomputed after a rollup.
+MEASURES = {
+    'Number of Products': ('our_price', 'size'),
+    'Total Price': ('our_price', 'sum'),
+    'Total Quantity': ('weight_per_restock', 'sum'),
+}
+
+
+def add_restock_month(inventory_df):
+    """
+    Adds restock_month (YYYY-MM) to the inventory, taken from the cleaned restock_date
+    Input: the cleaned inventory DataFrame
+    """
+    inventory_df['restock_month'] = inventory_df['restock_date'].str[:7]
+    return inventory_df
+
+
+def build_cube(inventory_df, dims=('category',)):
+    """
+    Returns the number of products, total price, total quantity and price per pound for every combination of dims, in one grouped pass
+    Input: the inventory DataFrame after unit conversion, and the columns to group by (e.g. category, store, restock_month)
+    """
+    dims = list(dims)
+    if 'restock_month' in dims and 'restock_month' not in inventory_df.columns:
+        inventory_df = add_restock_month(inventory_df)
+
+    # sort=False keeps the groups in order of first appearance, as unique() does
+    cube = inventory_df.groupby(dims, sort=False, observed=True, dropna=False).agg(**MEASURES)
+    cube['Price Per Pound'] = cube['Total Price'] / cube['Total Quantity']
+    return cube
+
+
+def rollup(cube, dims):
+    """
+    Returns the cube summed up to fewer dims, without going back to the raw rows
+    Input: a cube from build_cube() and the subset of its dims to keep
+    """
+    dims = list(dims)
+    rolled = cube[list(MEASURES)].groupby(level=dims, sort=False, observed=True, dropna=False).sum()
+    rolled['Price Per Pound'] = rolled['Total Price'] / rolled['Total Quantity']
+    return rolled
+
+
+def aggregate_categories(inventory_df):
+    """
+    Returns the number of products, total price, total quantity and price per pound of each category
+    Input: the inventory DataFrame after unit conversion
+    """
+    inventory_categories_df = build_cube(inventory_df, ['category']).reset_index()
+    return inventory_categories_df.rename(columns={'category': 'Category'})
@@ -1,239 +1,249 @@
-from bs4 import BeautifulSoup
-import matplotlib.pyplot as plt
-import numpy as np
+import argparse
 import os
-import pandas as pd
-import requests
-import sys
-from utils import extract_column_from_header
 
-dataPath = sys.argv[1]
+# Only the standard library is imported here. Each stage imports what it needs (pandas, lxml, requests, ...) when it first runs,
+# so the command line starts quickly and the stages can be imported and reused from another process, e.g. a scheduler.
 
-# Read the CSV file from the data folder
 script_dir = os.path.dirname(__file__)  # Script directory
-file_path = os.path.join(script_dir, '../' + dataPath)
-inventory_df = pd.read_csv(file_path)
-
-# Refine our_price: Remove any non-numerical signs, then set any non-number value to the currently existing minimum numerical value
-inventory_df['our_price'] = inventory_df['our_price'].str.replace('$', '')
-inventory_df['our_price'] = pd.to_numeric(inventory_df['our_price'], downcast='integer', errors='coerce')
-our_price_min = inventory_df['our_price'].min()
-inventory_df['our_price'] = inventory_df['our_price'].replace(np.nan,our_price_min)
-
-# Refine current_stock: Set any non-number value to 0
-inventory_df['current_stock'] = pd.to_numeric(inventory_df['current_stock'], downcast='integer', errors='coerce')
-inventory_df['current_stock'] = inventory_df['current_stock'].replace(np.nan,0)
-
-# Refine restock_threshold: Set any non-number value to the currently existing minimum numerical value
-restock_threshold_min = inventory_df['restock_threshold'].min()
-inventory_df['restock_threshold'] = inventory_df['restock_threshold'].replace(np.nan,restock_threshold_min)
-
-# Refine restock_date: Convert to datetime
-inventory_df['restock_date'] = pd.to_datetime(inventory_df['restock_date'],format='mixed').dt.strftime('%Y-%m-%d')
-
-# Refine category: This depends on product_name. Check if product_name contains certain words, then replace the category
-inventory_df['category'] = inventory_df['category'].str.capitalize()
-
-coffee_list = ['coffee', 'bean', 'brew']
-coffee_pattern = '|'.join(coffee_list)
-inventory_df.loc[inventory_df['product_name'].str.contains(coffee_pattern, case=False), 'category'] = 'Coffee'
-
-tea_list = ['tea', 'matcha', 'chai']
-tea_pattern = '|'.join(tea_list)
-inventory_df.loc[inventory_df['product_name'].str.contains(tea_pattern, case=False), 'category'] = 'Tea'
-
-# For our economic insight, we will be comparing the total per-pound price of beverage materials including beverage for this store per year with the average price per pound per year for both beverage types.
-# This will allow us to determine the deviation between the yearly earnings by our shop and the average expenses per year.
-# Assume that the restock threshold indicates how much of each product will be purchased per month.
-
-# Extract weight per unit from each product_name. If the unit is absent, assume the product is sold in batches of 1 pound.
-inventory_df['unit_number'] = inventory_df['product_name'].str.extract('(\d+)')
-inventory_df['unit_number'].fillna(1)
-
-# First, convert the unit number into pounds per unit
-inventory_df['pounds_per_unit'] = np.nan
-
-# Then, multiply each our_price by restock_threshold to get earnings_per_restock, and each pounds_per_unit by current_stock to get weight_per_restock
-inventory_df['earnings_per_restock'] = np.nan
-inventory_df['weight_per_restock'] = np.nan
-
-for index, row in inventory_df.iterrows():
-    r1 = row['unit_number']
-    price = row['our_price']
-    stock = row['restock_threshold']
-    r2 = 1.0
-    if r1: # Change r2 from the default pounds per unit only if the unit number is defined in the product name
-        if 'lb' in row['product_name']:
-            r2 = float(r1)
-        elif 'oz' in row['product_name']:
-            r2 = float(r1)/16
-        elif 'bags' in row['product_name']:
-            r2 = float(r1)/200
-    
-    inventory_df.at[index, 'pounds_per_unit'] = r2
-    inventory_df.at[index, 'earnings_per_restock'] = price * stock
-    inventory_df.at[index, 'weight_per_restock'] = r2 * stock
-
-# Output the DataFrame for checking purposes
-# print(inventory_df)
-
-# For data anlysis, get the number of products for each type, along with the total price, quantity, and price per pound of each type
-categories = inventory_df['category'].unique()
-keys = ['Category','Number of Products','Total Price','Total Quantity','Price Per Pound']
-inventory_categories_dict= dict(zip(keys, ([] for _ in keys)))
-for category in categories:
-    category_total_price = inventory_df[inventory_df['category']==str(category)]['our_price'].sum()
-    category_total_pounds = inventory_df[inventory_df['category']==str(category)]['weight_per_restock'].sum()
-    inventory_categories_dict['Category'].append(category)
-    inventory_categories_dict['Number of Products'].append(inventory_df['category'].value_counts().get(str(category), 0))
-    inventory_categories_dict['Total Price'].append(category_total_price)
-    inventory_categories_dict['Total Quantity'].append(category_total_pounds)
-    inventory_categories_dict['Price Per Pound'].append(category_total_price/category_total_pounds)
-
-inventory_categories_df = pd.DataFrame({ key:pd.Series(value) for key, value in inventory_categories_dict.items() })
-
-# Extract the sum of all earnings_per_restock, then divide by the sum of all weight_per_restock to get the total cost per pound.
-bvg_earnings_per_month = inventory_df['earnings_per_restock'].sum()
-beverage_quantity = inventory_df['weight_per_restock'].sum()
-beverage_earnings_per_pound = bvg_earnings_per_month / beverage_quantity
-beverage_total_per_year = bvg_earnings_per_month * 12
-
-print('Total local beverage earnings per pound: ${:,.2f}'.format(beverage_earnings_per_pound))
-print('Total local beverage earnings per year: ${:,.2f}'.format(beverage_total_per_year))
-
-# Now we obtain the global prices per pound (the supply) and extract the coffee prices.
-
-# First, obtain the average prices per pound and extract the coffee prices.
-# We're using in2013dollars.com's historical chart data for coffee prices per pound by year.
-static_url = "https://www.in2013dollars.com/Beverage-materials-including-coffee-and-tea/price-inflation"
-in2013dollars_data  = requests.get(static_url).text
-
-# Use BeautifulSoup() to create a BeautifulSoup object from a response text content, then verify if the parse ran correctly
-in2013dollars_soup = BeautifulSoup(in2013dollars_data, 'html.parser')
-print(in2013dollars_soup.title) # To verify whether this works
-
-# Use the find_all function in the BeautifulSoup object with the element type of 'table', then assign the result to a list called 'html_tables'
-html_tables = in2013dollars_soup.find_all('table')
-in2013dollars_table = html_tables[0]
-print(in2013dollars_table.title)
-
-column_names = []
-
-# Apply the find_all() function with 'th' element on products_table
-# Iterate each th element and apply the provided extract_column_from_header() to get a column name
-# Append the Non-empty column name (`if name is not None and len(name) > 0`) into a list called column_names
-column_headers = in2013dollars_table.find_all('th')
-for row in column_headers:
-    name = extract_column_from_header(row)
-    if name is not None and len(name) > 0:
-        column_names.append(name)
-
-# print(column_names)
-
-# We will create an empty dictionary with keys from the extracted column names. We can then convert this into a Pandas dataframe
-in2013dollars_dict= dict.fromkeys(column_names)
-
-# Initialize the in2013dollars_dict with each value to be an empty list
-in2013dollars_dict['Year'] = []
-in2013dollars_dict['U.S.D. Value'] = []
-in2013dollars_dict['Inflation Rate'] = []
-
-for rows in in2013dollars_table.find_all("tr"):
-    if rows.th:
-        flag = False
-    else:
-        flag = True
-    row=rows.find_all('td')
-    # print(row)
-    
-    if flag:
-        year=row[0].get_text()
-        # print(crop)
-        in2013dollars_dict['Year'].append(int(year))
-        
-        value=row[1].get_text()
-        # print(global_gpv)
-        value_num = value.strip('$')
-        in2013dollars_dict['U.S.D. Value'].append(float(value_num))
-        
-        inflation_rate = row[2].get_text()
-        # print(global_prod)
-        inflation_rate_num = inflation_rate.replace('%','').replace('*','')
-        if any(chr.isdigit() for chr in inflation_rate_num):
-            in2013dollars_dict['Inflation Rate'].append(float(inflation_rate_num))
-        else: #To cover the null value for this column in 1997
-            in2013dollars_dict['Inflation Rate'].append(0.0)
-
-in2013dollars_df= pd.DataFrame({ key:pd.Series(value) for key, value in in2013dollars_dict.items() })
-
-# print(in2013dollars_df)
-
-# Now, extract the average adjusted price in U.S.D./pound for the year 2024.
-beverage_average_price = float(in2013dollars_df.loc[in2013dollars_df['Year']==2024, 'U.S.D. Value'])
-print('Average beverage price per pound: ${:,.2f}'.format(beverage_average_price))
-
-# Multiply this by the total beverage weight and by twelve months, we obtain the expenses per year if we buy all our beverages at national average price
-beverage_total_price = float(in2013dollars_df.loc[in2013dollars_df['Year']==2024, 'U.S.D. Value']) * beverage_quantity * 12
-print('Totl beverage expenses based on national average: ${:,.2f}'.format(beverage_total_price))
-
-# Finally, print the report.md file. Remove any previous report.md file first to clear the way for generating a new one.
-if os.path.exists('report.md'):
-    os.remove('report.md')
-
-with open('report.md', 'a+') as f:
-    f.write('# Overview\n\n')
-    f.write('This study serves as a comparison between pricing data obtained from our local coffee shop and average pricing data for restaurant-sold coffee in the U.S.. The business insight to be gleaned from this therefore concerns how much the earnings made per year by the shop deviates from the nationwide average per year, which can be used to determine if prices are too high or too low compared to this average as a factor into critical business decisions.\n\n')
-    f.write('# Data quality issues and wrangling\n\n')
-    f.write('The products.csv file used for this study is stored in the /data directory of this project, and was read into the Python script and stored via Pandas, using its read_csv() function to convert it into a DataFrame object. \n\n')
-    f.write('Wrangling the data involved reformatting it via the following steps:\n\n')
-    f.write('- Refine our_price: Remove any non-numerical signs, then set any non-number value to the currently existing minimum numerical value.\n\n')
-    f.write('- Refine current_stock: Set any non-number value to 0.\n\n')
-    f.write('- Refine restock_threshold: Set any non-number value to the currently existing minimum numerical value.\n\n')
-    f.write('- Refine restock_date: Convert to datetime and remove any rows with a NaN value.\n\n')
-    f.write('- Refine category: This depends on product_name. Check if product_name contains certain words, then replace the category. The category is set to "coffee" for words such as "coffee", "bean", and "brew", and to "tea" for words such as "tea", "matcha", and "chai".\n\n')
-    f.write('# Data summary\n\n')
-    f.write('The processed data post-wrangling is shown:\n\n')
-    f.write("| Product Name | Our Price | Category | Current Stock | Restock Threshold | Restock Date | Price Per Restock | Weight Per Restock (lbs) |\n")
-    f.write("| ----------: | ----------: | ----------: | ----------: | ----------: | ----------: | ----------: | ----------: |\n")
-    for index, row in inventory_df.iterrows():
-        f.write(f"| {row['product_name']} | {'${:,.2f}'.format(row['our_price'])} | {row['category']} | {row['current_stock']} | {row['restock_threshold']} | {row['restock_date']} | {'${:,.2f}'.format(row['earnings_per_restock'])} | {row['weight_per_restock']} |\n")
-    f.write("\n")
-    f.write('The different categories of beverage and the number of products sold under each are as follows:\n\n')
-    f.write("| Category | Number of Products | Cumulative Price (U.S.D.) Per Pound |\n")
-    f.write("| ----------: | ----------: | ----------: |\n")
-    for index, row in inventory_categories_df.iterrows():
-        f.write(f"| {row['Category']} | {row['Number of Products']} | {'${:,.2f}'.format(row['Price Per Pound'])} |\n")
-    f.write("\n")
-    f.write('# External data integration\n\n')
-    f.write('Our external source is in2013dollars.com, and specifically their free dataset of national average prices across all U.S. cities for <i>beverage materials including coffee and tea</i> from 1997 to 2024. This will allow us to obtain the average annual price in U.S.D. for beverages overall. The site is also one of the few such databases that can be freely webscraped and since it cites the U.S. Bureau of Labor Statistics as the source for its data, it can be assumed that said data is reasonably accurate. We will select data for the most recent year, in this case 2024 (the most recent full year as of this study).\n\n')
-    f.write('Webscraping was done with BeautifulSoup, which enabled extraction of the HTML table and refinement of the external data to remove HTML formatting and preserve the numerical values for the Year, U.S.D. Value, and Inflation Rate.\n\n')
-    f.write("| Year | U.S.D. Value | Inflation Rate |\n")
-    f.write("| ----: | ----------: | ----------: |\n")
-    for index, row in in2013dollars_df.iterrows():
-        f.write(f"| {int(row['Year'])} | {'${:,.2f}'.format(row['U.S.D. Value'])} | {'{:,.2f}%'.format(row['Inflation Rate'])} |\n")
-    f.write('\n\n')
-    f.write('Source URL: https://www.in2013dollars.com/Beverage-materials-including-coffee-and-tea/price-inflation\n\n')
-    f.write('# Business insights\n\n')
-    f.write('For our economic insight, we compared the total per-pound price of all beverages for this store with the prices per pound per year. This allowed us to determine the difference between the yearly earnings by beverages sold at our shop and the yearly beverage prices per pound. This can be important to know when it comes to determining how to increase customer inflow; if we are above average, customers may not be willing to buy from us as often as with other stores.\n\n')
-    f.write('## Inventory earnings per year\n\n')
-    f.write('For calculation simplicity, the restock threshold is assumed to indicate how much of each product will be purchased per month, and we will also assume that every single unit we receive is sold before the end of the year.\n\n')
-    f.write('To obtain the pound-weight for each item, the numerical quantity per unit is extracted from each product name (column "product_name"). If this number is absent, the product is assumed to be sold at a rate of 1 pound per package.\n\n')
-    f.write('Should quantity per unit be present in the product name, it will be converted into pounds per unit; the program checks what unit the item is sold in, and if the amount of an item per package is in pounds then that amount will be used in subsequent calculations as-is. If the item is sold in ounces, the number of ounces per package is divided by 16 to obtain the pounds per package. For tea bags, a pound of tea leaves is assumed to be equivalent to 200 bags, so the amount of bags is divided by 200 to obtain the pound weight. Once the pound-weights per unit for all items are obtained, we multiply the price for each item by its restock threshold to get price per monthly restock, and the pound-weight for each item by its restock threshold to get quantity per monthly restock.\n\n')
-    f.write('We then extract the sum of all prices per monthly restock for all items and multiply this by twelve months to get the total supply price per year for all beverage items put together. Thus, we have:\n\n')
-    f.write('Local beverage earnings per pound: <b>${:,.2f}</b>\n\n'.format(beverage_earnings_per_pound))
-    f.write('Finally, we multiply the monthly beverage earnings by twelve months to get the earnings per year, assuming all stock is sold before the end of the year:\n\n')
-    f.write('Local beverage earnings per year: <b>${:,.2f}</b>\n\n'.format(beverage_total_per_year))
-    f.write('## Average U.S. beverage price per year\n\n')
-    f.write('For these calculations, assume that the national average is for each pound-unit of any beverage ingredient sold in any U.S. city. From the webscraped in2013dollars.com dataset, we extract the average beverage price from the year 2024 to get:\n\n')
-    f.write('National average price per pound (2024): <b>${:,.2f}</b>\n\n'.format(beverage_average_price))
-    f.write('Multiplying this by the total beverage weight and by twelve months, we obtain the expenses per year if we buy all our beverage ingredients at national average price:\n\n')
-    f.write('Total expenses based on average ingredient price: <b>${:,.2f}</b>\n\n'.format(beverage_total_price))
-    f.write('The price at which our goods are sold is thus, on average, below the average price of all beverages in all U.S. cities. However, this would also mean that if we were to buy our inventory at the average national price as per the current rate, we would be at a deficit because even the lowest average beverage price within the last two decades, at $19.26 in 2002, is still over a dollar above our average beverage price.\n\n')
-    f.write('# Future recommendations\n\n')
-    f.write('As noted above, on average we sell our beverages at a price below the national average, which has the benefit of attracting customers who would be more interested in saving money by purchasing from a seller whose price offerings are lower, but assuming that we buy inventory strictly at the national average rate, and assuming that rate is per pound of beverage ingredient, we will be facing a deficit of <b>${:,.2f}</b> per year (based on the national average in 2024). However, prices for individual beverage ingredients vary in the same way as those of our goods do depending on the type of beverage being purchased. To better match expenses to earnings and potentially turn a profit, we would need to find a choice or selection of vendors for each drink type that offer ingredients at the lowest price possible while still maintaining sufficient ingredient quality (since a higher-quality product will also be good for sales).\n\n'.format(beverage_total_price - beverage_total_per_year))
-    f.write('The other recommendation for profit increase, assuming lower-price vendors are unavailable and/or quality cannot be sacrificed, would be to offer our goods at higher prices, bringing the average earning price per pound of ingredient closer to the national average. This is more risky if the lower prices are the primary reason for customers wanting to buy from us in the first place, but if we can find higher-quality vendors for ingredients to improve the goods themselves, then the price increase may be worth the additional investment due to better public standing improving business as much as lower prices. However, selecting higher-quality vendors may also run the risk of the expenses being increased in turn due to having to spend more to afford the ingredients they have on offer.\n\n')
-    f.write('As such, the recommendations are largely dependent on whether or not we can find vendors that offer the same quality of product at a lower cost to us:\n\n')
-    f.write('- If vendors that sell ingredients of an acceptable quality at lower prices exist, change the vendors to the option that reduces expenses, and potentially increase the restock threshold to offer more of the product to customers.\n\n')
-    f.write('- If there are no vendors that can provide ingredients below the national average, instead raise the prices of the goods we sell, but also look for vendors that provide higher-quality versions of these items. In this way, we can make a trade-off between attracting customers with our current lower prices and bolstering our PR among the consumer base with higher-quality purchases.\n\n')
-    f.write('(c) Adrian Tan, 2025\n\n')
-    # markdown.markdownFromFile(input=f, output=dir+'/out.html')
+BEVERAGE_SERIES = 'Beverage materials including coffee and tea'
+REPORT_YEAR = 2024
+
+
+def load(file_path, chunksize=None):
+    """
+    Reads the inventory CSV. With a chunk size, the file is read in bounded chunks with compact dtypes, and each chunk is
+    cleaned and classified as it is read (see ingest.py), so the clean and classify stages have nothing left to do.
+    Input: the path of the inventory CSV and optionally the number of rows to read per chunk
+    """
+    if chunksize:
+        from ingest import load_inventory_chunked
+        return load_inventory_chunked(file_path, chunksize)
+
+    import pandas as pd
+    return pd.read_csv(file_path)
+
+
+def clean(inventory_df):
+    """
+    Refines our_price, current_stock, restock_threshold, restock_date and category (see ingest.clean_inventory())
+    Input: the raw inventory DataFrame
+    """
+    from ingest import clean_inventory
+    return clean_inventory(inventory_df)
+
+
+def classify(inventory_df):
+    """
+    Refines the category from product_name, using the keywords stored in config/categories.json
+    Input: the cleaned inventory DataFrame
+    """
+    from classify import classify_inventory
+    return classify_inventory(inventory_df)
+
+
+def convert(inventory_df):
+    """
+    Extracts weight per unit from each product_name and converts it into pounds per unit. If the unit is absent, assume the product is sold in batches of 1 pound.
+    Then, multiplies each our_price by restock_threshold to get earnings_per_restock, and each pounds_per_unit by restock_threshold to get weight_per_restock.
+    The conversion factors for each unit are stored in config/units.json
+    Input: the cleaned inventory DataFrame
+    """
+    from units import convert_units
+    return convert_units(inventory_df)
+
+
+def aggregate(inventory_df):
+    """
+    Returns the per-category totals and the local earnings figures
+    Input: the inventory DataFrame after unit conversion
+    """
+    from aggregate import aggregate_categories
+
+    # For data anlysis, get the number of products for each type, along with the total price, quantity, and price per pound of each type
+    inventory_categories_df = aggregate_categories(inventory_df)
+
+    # Extract the sum of all earnings_per_restock, then divide by the sum of all weight_per_restock to get the total cost per pound.
+    bvg_earnings_per_month = inventory_df['earnings_per_restock'].sum()
+    beverage_quantity = inventory_df['weight_per_restock'].sum()
+    figures = {
+        'beverage_quantity': beverage_quantity,
+        'beverage_earnings_per_pound': bvg_earnings_per_month / beverage_quantity,
+        'beverage_total_per_year': bvg_earnings_per_month * 12,
+    }
+
+    print('Total local beverage earnings per pound: ${:,.2f}'.format(figures['beverage_earnings_per_pound']))
+    print('Total local beverage earnings per year: ${:,.2f}'.format(figures['beverage_total_per_year']))
+    return inventory_categories_df, figures
+
+
+def fetch_external(offline=None, cache_ttl=None):
+    """
+    Returns every price series listed in config/series.json as one long table, and the beverage materials series the report uses
+    Input: whether to stay offline and the cache TTL in seconds (by default, the settings in cache.py)
+    """
+    from fetch import fetch_series, load_series, series_frame
+
+    # Now we obtain the global prices per pound (the supply) and extract the coffee prices.
+    # First, obtain the average prices per pound and extract the coffee prices.
+    # We're using in2013dollars.com's historical chart data for coffee prices per pound by year.
+    # Alongside it, we fetch the separate series listed in config/series.json (e.g. coffee, tea and dairy) for comparison.
+    # The pages are fetched concurrently (see fetch.py) through the on-disk cache in cache.py, which only goes back to the site once the cached copy is older than its TTL
+    # Use lxml to extract the first table of each page into a DataFrame (see tables.py); the parsed DataFrames are cached alongside the pages
+    fetch_options = {}
+    if offline is not None:
+        fetch_options['offline'] = offline
+    if cache_ttl is not None:
+        fetch_options['ttl'] = cache_ttl
+
+    series_urls = load_series()
+    price_series_df = fetch_series(series_urls, errors='skip', **fetch_options)
+    if BEVERAGE_SERIES not in set(price_series_df['Series']):
+        raise RuntimeError(f'Could not fetch {series_urls[BEVERAGE_SERIES]}, which the report depends on')
+    in2013dollars_df = series_frame(price_series_df, BEVERAGE_SERIES)
+
+    # Print the most recent price per pound of every series for comparison
+    for name, series_df in price_series_df.groupby('Series', sort=False):
+        latest = series_df.loc[series_df['Year'].idxmax()]
+        print('{} price per pound ({}): ${:,.2f}'.format(name, int(latest['Year']), latest['U.S.D. Value']))
+    return price_series_df, in2013dollars_df
+
+
+def compare(in2013dollars_df, figures):
+    """
+    Adds the national average price per pound and the expenses per year at that price to the figures
+    Input: the beverage materials series and the figures from aggregate()
+    """
+    # Now, extract the average adjusted price in U.S.D./pound for the year 2024.
+    beverage_average_price = float(in2013dollars_df.loc[in2013dollars_df['Year']==REPORT_YEAR, 'U.S.D. Value'].iloc[0])
+    print('Average beverage price per pound: ${:,.2f}'.format(beverage_average_price))
+
+    # Multiply this by the total beverage weight and by twelve months, we obtain the expenses per year if we buy all our beverages at national average price
+    beverage_total_price = beverage_average_price * figures['beverage_quantity'] * 12
+    print('Totl beverage expenses based on national average: ${:,.2f}'.format(beverage_total_price))
+
+    figures['beverage_average_price'] = beverage_average_price
+    figures['beverage_total_price'] = beverage_total_price
+    return figures
+
+
+def render(report_path, inventory_df, inventory_categories_df, in2013dollars_df, figures, stage_metrics=None):
+    """
+    Writes the report. Each section is rendered from its own inputs, and sections whose inputs have not changed since the last run are reused (see report.py)
+    Input: the report path, the inventory, the per-category totals, the beverage materials series, the figures from compare(),
+    and optionally the stage metrics recorded so far, to add as a Run metrics section
+    """
+    from report import (business_insights_section, data_summary_section, external_data_section, metrics_section, overview_section,
+                        recommendations_section, write_report)
+
+    report_sections = [
+        ('overview', overview_section, ()),
+        ('data_summary', data_summary_section, (inventory_df, inventory_categories_df)),
+        ('external_data', external_data_section, (in2013dollars_df,)),
+        ('business_insights', business_insights_section, (figures['beverage_earnings_per_pound'], figures['beverage_total_per_year'],
+                                                          figures['beverage_average_price'], figures['beverage_total_price'])),
+        ('recommendations', recommendations_section, (figures['beverage_total_price'] - figures['beverage_total_per_year'],)),
+    ]
+    if stage_metrics is not None:
+        report_sections.append(('metrics', metrics_section, (list(stage_metrics),)))
+    write_report(report_path, report_sections)
+
+
+def run(data_path, report_path='report.md', chunksize=None, offline=None, cache_ttl=None, recorder=None, metrics_in_report=False):
+    """
+    Runs the whole analysis for one inventory file and writes its report. Returns the figures quoted in the report.
+    Input: the path of the inventory CSV (relative paths are taken from the project directory), the report path,
+    optionally a chunk size for reading the CSV, whether to stay offline and the cache TTL in seconds,
+    an instrument.StageRecorder to record each stage with, and whether to add the stage metrics to the report
+    """
+    from instrument import StageRecorder
+
+    if recorder is None:
+        recorder = StageRecorder()
+
+    # Read the CSV file from the data folder and clean it
+    file_path = os.path.join(script_dir, '..', data_path)
+    with recorder.stage('load') as stage:
+        inventory_df = load(file_path, chunksize)
+        stage['rows'] = len(inventory_df)
+    if not chunksize:
+        with recorder.stage('clean') as stage:
+            inventory_df = clean(inventory_df)
+            stage['rows'] = len(inventory_df)
+        with recorder.stage('classify') as stage:
+            inventory_df = classify(inventory_df)
+            stage['rows'] = len(inventory_df)
+
+    # For our economic insight, we will be comparing the total per-pound price of beverage materials including beverage for this store per year with the average price per pound per year for both beverage types.
+    # This will allow us to determine the deviation between the yearly earnings by our shop and the average expenses per year.
+    # Assume that the restock threshold indicates how much of each product will be purchased per month.
+    with recorder.stage('convert') as stage:
+        inventory_df = convert(inventory_df)
+        stage['rows'] = len(inventory_df)
+    with recorder.stage('aggregate') as stage:
+        inventory_categories_df, figures = aggregate(inventory_df)
+        stage['rows'] = len(inventory_df)
+
+    with recorder.stage('fetch_external') as stage:
+        price_series_df, in2013dollars_df = fetch_external(offline, cache_ttl)
+        stage['rows'] = len(price_series_df)
+    with recorder.stage('compare') as stage:
+        figures = compare(in2013dollars_df, figures)
+        stage['rows'] = len(in2013dollars_df)
+
+    # Finally, write the report.md file. The metrics section covers every stage up to, but not including, the report itself.
+    with recorder.stage('render') as stage:
+        render(report_path, inventory_df, inventory_categories_df, in2013dollars_df, figures,
+               recorder.stages if metrics_in_report else None)
+        stage['rows'] = len(inventory_df)
+    return figures
+
+
+def path_for(path, data_path, several):
+    # With several inventory files, each output is named after its file, e.g. report-products.md
+    if not several:
+        return path
+    stem, extension = os.path.splitext(path)
+    return f'{stem}-{os.path.splitext(os.path.basename(data_path))[0]}{extension}'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare local beverage earnings with national average beverage prices.')
+    parser.add_argument('data_paths', nargs='+', metavar='data_path',
+                        help='inventory CSV, e.g. data/products.csv; several files are analysed back-to-back in one process')
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help='read the CSV in chunks of this many rows, for files too large to read at once')
+    parser.add_argument('--report', default='report.md', help='path of the report to write (default: report.md)')
+    parser.add_argument('--offline', action='store_true', default=None, help='use cached price series only')
+    parser.add_argument('--cache-ttl', type=float, default=None, help='seconds before a cached price series is re-requested')
+    parser.add_argument('--metrics', default=None,
+                        help='write a JSON summary of wall time, CPU time, rows and process peak memory per stage to this path')
+    parser.add_argument('--metrics-in-report', action='store_true', help='add the stage metrics to the report as a Run metrics section')
+    parser.add_argument('--trace-memory', action='store_true', help="also record each stage's own peak of Python allocations with tracemalloc")
+    parser.add_argument('--profile', default=None, metavar='DIR', help='profile each stage with cProfile and write <stage>.prof files to DIR')
+    args = parser.parse_args(argv)
+
+    # The chunk size used to be given as a second positional argument; keep accepting it
+    data_paths = args.data_paths
+    chunksize = args.chunksize
+    if chunksize is None and len(data_paths) == 2 and data_paths[1].isdigit():
+        data_paths, chunksize = data_paths[:1], int(data_paths[1])
+
+    several = len(data_paths) > 1
+    for data_path in data_paths:
+        recorder = None
+        if args.metrics or args.metrics_in_report or args.trace_memory or args.profile:
+            from instrument import StageRecorder
+            profile_dir = args.profile
+            if profile_dir and several:
+                profile_dir = os.path.join(profile_dir, os.path.splitext(os.path.basename(data_path))[0])
+            recorder = StageRecorder(trace_memory=args.trace_memory, profile_dir=profile_dir)
+
+        report_path = path_for(args.report, data_path, several)
+        run(data_path, report_path, chunksize, args.offline, args.cache_ttl, recorder, args.metrics_in_report)
+
+        if args.metrics:
+            recorder.write_summary(path_for(args.metrics, data_path, several), data_path=data_path, report_path=report_path, chunksize=chunksize)
+
+
+if __name__ == '__main__':
+    main()
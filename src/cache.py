@@ -0,0 +1,141 @@
+import hashlib
+import io
+import json
+import os
+import time
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# The scraped series only change yearly, so pages are cached on disk and only re-requested once they are older than the TTL.
+# ANALYSIS_OFFLINE=1 never touches the network and uses whatever copy is cached, however old.
+CACHE_DIR = os.environ.get('ANALYSIS_CACHE_DIR', os.path.join(os.path.dirname(__file__), '..', '.cache'))
+CACHE_TTL = float(os.environ.get('ANALYSIS_CACHE_TTL', 7 * 24 * 60 * 60))  # Seconds
+OFFLINE = os.environ.get('ANALYSIS_OFFLINE', '') not in ('', '0')
+TIMEOUT = 10  # Seconds
+RETRIES = 2
+
+
+def make_session(retries=RETRIES, pool_size=10):
+    """
+    Returns a requests session that retries failed connections and server errors with backoff
+    Input: the number of retries and the size of the connection pool
+    """
+    retry = Retry(total=retries, backoff_factor=0.5, status_forcelist=[500, 502, 503, 504])
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def cache_paths(url, cache_dir=CACHE_DIR):
+    """
+    Returns the paths of the cached HTML, its metadata and the parsed DataFrame for a URL
+    Input: the URL and the cache directory
+    """
+    key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+    base = os.path.join(cache_dir, key)
+    return {'html': base + '.html', 'meta': base + '.json', 'frame': base + '.frame.json'}
+
+
+def read_json(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_atomic(path, text):
+    """
+    Writes a file through a temporary file in the same directory, so readers never see a half-written file
+    Input: the path and the text to write
+    """
+    # open() creates the temporary file with the usual permissions (subject to the umask), and os.replace() keeps them
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(temp_path, path)
+
+
+def fetch_html(url, cache_dir=CACHE_DIR, ttl=CACHE_TTL, offline=OFFLINE, timeout=TIMEOUT, session=None):
+    """
+    Returns the HTML of a page and the SHA-256 digest of its content, from the cache when possible
+    Input: the URL, the cache directory, the TTL in seconds, whether to stay offline, the request timeout in seconds
+    and optionally a requests session to reuse
+    """
+    paths = cache_paths(url, cache_dir)
+    meta = read_json(paths['meta'])
+    cached = meta is not None and os.path.exists(paths['html'])
+
+    def cached_html():
+        with open(paths['html'], encoding='utf-8') as f:
+            return f.read(), meta['digest']
+
+    if offline:
+        if not cached:
+            raise RuntimeError(f'Offline mode is on and {url} has not been cached yet')
+        return cached_html()
+    if cached and time.time() - meta['fetched_at'] < ttl:
+        return cached_html()
+
+    # The cached copy is stale or missing, so ask the server, letting it answer 304 Not Modified if the page has not changed
+    headers = {}
+    if cached and meta.get('etag'):
+        headers['If-None-Match'] = meta['etag']
+    if cached and meta.get('last_modified'):
+        headers['If-Modified-Since'] = meta['last_modified']
+
+    if session is None:
+        session = make_session()
+    try:
+        response = session.get(url, headers=headers, timeout=timeout)
+        if response.status_code != 304:
+            response.raise_for_status()
+    except requests.RequestException as error:
+        if not cached:
+            raise
+        print(f'Could not refresh {url} ({error}); using the cached copy')
+        return cached_html()
+
+    os.makedirs(cache_dir, exist_ok=True)
+    if response.status_code == 304 and cached:
+        meta['fetched_at'] = time.time()
+        write_atomic(paths['meta'], json.dumps(meta))
+        return cached_html()
+
+    html = response.text
+    meta = {
+        'url': url,
+        'fetched_at': time.time(),
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'digest': hashlib.sha256(html.encode('utf-8')).hexdigest(),
+    }
+    write_atomic(paths['html'], html)
+    write_atomic(paths['meta'], json.dumps(meta))
+    return html, meta['digest']
+
+
+def fetch_frame(url, parse, cache_dir=CACHE_DIR, **fetch_options):
+    """
+    Returns the DataFrame parsed from a page, reusing the cached DataFrame if the page content has not changed
+    Input: the URL, a function that parses the HTML into a DataFrame, the cache directory and any options for fetch_html()
+    """
+    html, digest = fetch_html(url, cache_dir=cache_dir, **fetch_options)
+    frame_path = cache_paths(url, cache_dir)['frame']
+
+    # The cached DataFrame is only valid for the same page content parsed by the same function
+    parser = f'{parse.__module__}.{parse.__qualname__}'
+    frame_cache = read_json(frame_path)
+    if frame_cache is not None and frame_cache['digest'] == digest and frame_cache.get('parser') == parser:
+        return pd.read_json(io.StringIO(json.dumps(frame_cache['frame'])), orient='table', precise_float=True)
+
+    frame = parse(html)
+    os.makedirs(cache_dir, exist_ok=True)
+    # orient='table' stores the dtypes with the data, so the cached DataFrame reads back exactly as parsed
+    frame_json = json.loads(frame.to_json(orient='table', double_precision=15))
+    write_atomic(frame_path, json.dumps({'digest': digest, 'parser': parser, 'frame': frame_json}))
+    return frame
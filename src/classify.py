@@ -0,0 +1,92 @@
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+# Each rule maps a list of keywords to a category. When a product name matches several categories,
+# the one with the highest priority wins. Add new rules to config/categories.json; no code changes are needed.
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(__file__), '..', 'config', 'categories.json')
+
+
+def load_category_rules(path=DEFAULT_RULES_PATH):
+    """
+    Returns the category rules as a list of dicts with category, priority and keywords, highest priority first
+    Input: the path of a JSON file holding a list of rules
+    """
+    with open(path) as f:
+        rules = json.load(f)
+    check_rules(rules)
+    # sorted() is stable, so rules with equal priority keep their order in the file
+    return sorted(rules, key=lambda rule: rule.get('priority', 0), reverse=True)
+
+
+def check_rules(rules):
+    """
+    Raises a ValueError if a rule has no keywords or an empty keyword, since an empty pattern would match every product name
+    Input: the category rules
+    """
+    for rule in rules:
+        keywords = rule.get('keywords')
+        if not isinstance(keywords, list) or not keywords:
+            raise ValueError(f'The category rule for {rule.get("category")!r} needs a non-empty list of keywords')
+        if any(not isinstance(keyword, str) or not keyword.strip() for keyword in keywords):
+            raise ValueError(f'The category rule for {rule.get("category")!r} has an empty keyword: {keywords!r}')
+
+
+def compile_rules(rules):
+    """
+    Returns one compiled regex covering every rule, with a named group per category
+    Input: the category rules from load_category_rules()
+    """
+    check_rules(rules)
+
+    # A zero-width lookahead reports a match at every position, so keywords that overlap are never hidden
+    # from each other. The groups follow rule priority, so at a given position the highest priority group wins.
+    groups = []
+    for index, rule in enumerate(rules):
+        keywords = sorted(rule['keywords'], key=len, reverse=True)
+        groups.append(f'(?P<rule{index}>' + '|'.join(re.escape(keyword) for keyword in keywords) + ')')
+    return re.compile('(?=' + '|'.join(groups) + ')', re.IGNORECASE)
+
+
+def classify_name(name, matcher, rules):
+    """
+    Returns the highest priority category whose keywords appear in the product name, or None
+    Input: a product name, the compiled matcher from compile_rules() and the rules it was built from
+    """
+    best = None
+    for match in matcher.finditer(name):
+        index = int(match.lastgroup[len('rule'):])
+        if best is None or index < best:
+            best = index
+            if best == 0:
+                break
+    return None if best is None else rules[best]['category']
+
+
+def classify_categories(product_names, categories, rules=None):
+    """
+    Returns the refined category of each product: the matched rule's category, or the existing category if no rule matches
+    Input: the product_name and category columns, and optionally the rules from load_category_rules()
+    """
+    if rules is None:
+        rules = load_category_rules()
+    matcher = compile_rules(rules)
+
+    # Classify each distinct product name once, since catalogs repeat names heavily across stores
+    codes, names = pd.factorize(product_names)
+    labels = np.array([classify_name(name, matcher, rules) for name in names] + [None], dtype=object)
+    matched = pd.Series(labels[codes], index=product_names.index)
+
+    return matched.fillna(categories).astype(categories.dtype)
+
+
+def classify_inventory(inventory_df, rules=None):
+    """
+    Refines the category of each product from its product_name and returns the inventory
+    Input: the cleaned inventory DataFrame, and optionally the rules from load_category_rules()
+    """
+    inventory_df['category'] = classify_categories(inventory_df['product_name'], inventory_df['category'], rules)
+    return inventory_df
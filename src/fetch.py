@@ -0,0 +1,74 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from cache import TIMEOUT, fetch_frame, make_session
+from tables import PRICE_TABLE_COLUMNS, parse_price_table
+
+# Price series to compare against, as a mapping of series name to in2013dollars.com page. Add new series to config/series.json.
+DEFAULT_SERIES_PATH = os.path.join(os.path.dirname(__file__), '..', 'config', 'series.json')
+MAX_WORKERS = 4
+
+
+def load_series(path=DEFAULT_SERIES_PATH):
+    """
+    Returns the price series to fetch as a dict of series name to URL
+    Input: the path of a JSON file mapping series names to URLs
+    """
+    with open(path) as f:
+        return json.load(f)
+
+
+def series_name(url):
+    """
+    Returns a readable series name for an in2013dollars.com URL, e.g. "Coffee" for https://www.in2013dollars.com/Coffee/price-inflation
+    Input: the URL of the series page
+    """
+    parts = [part for part in url.split('/') if part]
+    name = parts[-2] if len(parts) > 1 and parts[-1] == 'price-inflation' else parts[-1]
+    return name.replace('-', ' ')
+
+
+def fetch_series(series, max_workers=MAX_WORKERS, timeout=TIMEOUT, errors='raise', **fetch_options):
+    """
+    Fetches several price series concurrently and returns them as one long table with Series, Year, U.S.D. Value and Inflation Rate
+    Input: a dict of series name to URL (or a list of URLs), the number of concurrent requests, the timeout of each request in seconds,
+    whether a series that fails should 'raise' or be skipped with a warning ('skip'), and any options for cache.fetch_frame()
+    """
+    if not isinstance(series, dict):
+        series = {series_name(url): url for url in series}
+
+    # One pooled session shared by all workers, with a connection slot for each of them
+    session = fetch_options.pop('session', None) or make_session(pool_size=max_workers)
+
+    def fetch_one(url):
+        return fetch_frame(url, parse_price_table, session=session, timeout=timeout, **fetch_options)
+
+    frames = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {name: executor.submit(fetch_one, url) for name, url in series.items()}
+        # Collect in the order the series were given, so the table does not depend on which request finished first
+        for name, future in futures.items():
+            try:
+                frame = future.result()
+            except Exception as error:
+                if errors == 'raise':
+                    raise
+                print(f'Could not fetch the {name} series ({error}); skipping it')
+                continue
+            frames.append(frame[PRICE_TABLE_COLUMNS].assign(Series=name))
+
+    if not frames:
+        return pd.DataFrame(columns=['Series'] + PRICE_TABLE_COLUMNS)
+    price_series_df = pd.concat(frames, ignore_index=True)
+    return price_series_df[['Series'] + PRICE_TABLE_COLUMNS]
+
+
+def series_frame(price_series_df, name):
+    """
+    Returns one series of the long table in the same shape as parse_price_table()
+    Input: the table from fetch_series() and the series name
+    """
+    return price_series_df.loc[price_series_df['Series'] == name, PRICE_TABLE_COLUMNS].reset_index(drop=True)
@@ -0,0 +1,162 @@
+import numpy as np
+import pandas as pd
+
+from classify import classify_inventory, load_category_rules
+from units import convert_units
+
+# The chunked reader reads every column as strings first, then cleans each chunk and stores it with compact dtypes.
+READ_DTYPES = {
+    'product_name': 'str',
+    'our_price': 'str',
+    'category': 'str',
+    'current_stock': 'str',
+    'restock_threshold': 'str',
+    'restock_date': 'str',
+}
+INT32_INFO = np.iinfo(np.int32)
+
+DEFAULT_CHUNKSIZE = 100_000
+
+
+def clean_price(our_price):
+    """
+    Returns our_price as numbers, with any non-numerical signs removed and any non-number value left as NaN
+    Input: the raw our_price column
+    """
+    our_price = our_price.astype(str).str.replace('$', '')
+    return pd.to_numeric(our_price, downcast='integer', errors='coerce')
+
+
+def clean_stock(current_stock):
+    """
+    Returns current_stock as numbers, with any non-number value left as NaN
+    Input: the raw current_stock column
+    """
+    return pd.to_numeric(current_stock, downcast='integer', errors='coerce')
+
+
+def clean_threshold(restock_threshold):
+    """
+    Returns restock_threshold as numbers, with any non-number value left as NaN
+    Input: the raw restock_threshold column
+    """
+    return pd.to_numeric(restock_threshold, errors='coerce')
+
+
+NUMERIC_CLEANERS = {'our_price': clean_price, 'current_stock': clean_stock, 'restock_threshold': clean_threshold}
+
+
+def clean_inventory(inventory_df, our_price_min=None, restock_threshold_min=None):
+    """
+    Applies the data cleaning steps to the raw inventory and returns it
+    Input: the raw inventory DataFrame, and optionally the minimums used to fill missing prices and restock thresholds
+    (by default, the minimums of this DataFrame are used)
+    """
+    # Refine our_price: Remove any non-numerical signs, then set any non-number value to the currently existing minimum numerical value
+    inventory_df['our_price'] = clean_price(inventory_df['our_price'])
+    if our_price_min is None:
+        our_price_min = inventory_df['our_price'].min()
+    inventory_df['our_price'] = inventory_df['our_price'].replace(np.nan, our_price_min)
+
+    # Refine current_stock: Set any non-number value to 0
+    inventory_df['current_stock'] = clean_stock(inventory_df['current_stock'])
+    inventory_df['current_stock'] = inventory_df['current_stock'].replace(np.nan, 0)
+
+    # Refine restock_threshold: Set any non-number value to the currently existing minimum numerical value
+    inventory_df['restock_threshold'] = clean_threshold(inventory_df['restock_threshold'])
+    if restock_threshold_min is None:
+        restock_threshold_min = inventory_df['restock_threshold'].min()
+    inventory_df['restock_threshold'] = inventory_df['restock_threshold'].replace(np.nan, restock_threshold_min)
+
+    # Refine restock_date: Convert to datetime
+    inventory_df['restock_date'] = pd.to_datetime(inventory_df['restock_date'], format='mixed').dt.strftime('%Y-%m-%d')
+
+    # Refine category: Capitalize it. The category is then refined from product_name by classify.classify_inventory()
+    inventory_df['category'] = inventory_df['category'].str.capitalize()
+
+    return inventory_df
+
+
+def load_inventory(file_path):
+    """
+    Reads the whole inventory CSV into memory and returns it cleaned and classified
+    Input: the path of the inventory CSV
+    """
+    inventory_df = pd.read_csv(file_path)
+    return classify_inventory(clean_inventory(inventory_df))
+
+
+def scan_inventory(file_path, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Returns the global minimums of our_price and restock_threshold, used to fill their missing values, and the compact dtype of each
+    column, as a dict with our_price_min, restock_threshold_min and dtypes
+    Input: the path of the inventory CSV and the number of rows to read per chunk
+    """
+    minimums = {column: np.nan for column in NUMERIC_CLEANERS}
+    maximums = dict(minimums)
+    integral = {column: True for column in NUMERIC_CLEANERS}
+    reader = pd.read_csv(file_path, usecols=list(NUMERIC_CLEANERS), dtype='str', chunksize=chunksize)
+    for chunk in reader:
+        for column, clean_column in NUMERIC_CLEANERS.items():
+            values = clean_column(chunk[column])
+            # A missing or fractional value anywhere in the file makes load_inventory() hold the whole column as floats
+            integral[column] = integral[column] and values.dtype.kind in 'iu'
+            minimums[column] = np.fmin(minimums[column], values.min())
+            maximums[column] = np.fmax(maximums[column], values.max())
+
+    # Whole-number columns are stored as int32 where they fit. Any other column stays float64: float32 would round prices such as 8.99
+    # and thresholds such as 12.5 differently from the in-memory path, and the report prints 45.0 for a float column but 45 for an integer one.
+    dtypes = {'category': 'category'}
+    for column in NUMERIC_CLEANERS:
+        if not integral[column]:
+            dtypes[column] = 'float64'
+        elif INT32_INFO.min <= minimums[column] and maximums[column] <= INT32_INFO.max:
+            dtypes[column] = 'int32'
+        else:
+            dtypes[column] = 'int64'
+    return {'our_price_min': minimums['our_price'], 'restock_threshold_min': minimums['restock_threshold'], 'dtypes': dtypes}
+
+
+def iter_inventory_chunks(file_path, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Yields the inventory CSV as cleaned and classified chunks with compact dtypes
+    Input: the path of the inventory CSV and the number of rows to read per chunk
+    """
+    # First pass: the missing-value fills and the dtypes depend on the whole file, so scan it before cleaning anything
+    scan = scan_inventory(file_path, chunksize)
+
+    # Second pass: clean each chunk with the global minimums so that the result matches load_inventory()
+    category_rules = load_category_rules()
+    reader = pd.read_csv(file_path, dtype=READ_DTYPES, chunksize=chunksize)
+    for chunk in reader:
+        chunk = clean_inventory(chunk, scan['our_price_min'], scan['restock_threshold_min'])
+        chunk = classify_inventory(chunk, category_rules)
+        yield chunk.astype(scan['dtypes'])
+
+
+def load_inventory_chunked(file_path, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Reads the inventory CSV in bounded chunks and returns it cleaned and classified, with compact dtypes.
+    Only the reading is bounded: the cleaned chunks are joined into one DataFrame, since the report lists every product.
+    Input: the path of the inventory CSV and the number of rows to read per chunk
+    """
+    chunks = list(iter_inventory_chunks(file_path, chunksize))
+    if not chunks:
+        return load_inventory(file_path)
+    inventory_df = pd.concat(chunks, ignore_index=True)
+    # Each chunk has its own set of categories, so rebuild the categorical over the whole inventory
+    return inventory_df.astype({'category': 'category'})
+
+
+def stream_totals(file_path, chunksize=DEFAULT_CHUNKSIZE, unit_table=None):
+    """
+    Returns the running totals of earnings_per_restock and weight_per_restock without holding the whole inventory in memory
+    Input: the path of the inventory CSV, the number of rows to read per chunk, and optionally a unit table
+    """
+    totals = {'rows': 0, 'earnings_per_restock': 0.0, 'weight_per_restock': 0.0}
+    for chunk in iter_inventory_chunks(file_path, chunksize):
+        chunk = convert_units(chunk, unit_table)
+        totals['rows'] += len(chunk)
+        totals['earnings_per_restock'] += float(chunk['earnings_per_restock'].sum())
+        totals['weight_per_restock'] += float(chunk['weight_per_restock'].sum())
+    return totals
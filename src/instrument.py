@@ -0,0 +1,105 @@
+import contextlib
+import cProfile
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+def peak_rss_mb():
+    """
+    Returns the peak resident memory of this process so far in MB, or None where it cannot be measured.
+    This is a high-water mark for the whole process: it never goes down, so it cannot tell one stage's peak from an earlier one's.
+    """
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class StageRecorder:
+    """
+    Records wall time, CPU time, rows processed and the process peak RSS at the end of each stage of a run.
+    The process peak RSS only ever rises, so it shows when the peak of the run was reached rather than how much each stage used;
+    for that, trace_memory records each stage's own peak of Python allocations with tracemalloc. Optionally profiles each stage with cProfile.
+    """
+
+    def __init__(self, trace_memory=False, profile_dir=None):
+        self.trace_memory = trace_memory
+        self.profile_dir = profile_dir
+        self.stages = []
+        self.started_at = datetime.now(timezone.utc)
+        self.start_wall = time.perf_counter()
+        self.start_cpu = time.process_time()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """
+        Measures the code run inside the with-block as one stage. Set the 'rows' key of the yielded dict to record rows processed.
+        Input: the stage name
+        """
+        record = {'stage': name, 'rows': None}
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            traced_before = tracemalloc.get_traced_memory()[0]
+        profiler = cProfile.Profile() if self.profile_dir else None
+
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield record
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            record['wall_s'] = time.perf_counter() - start_wall
+            record['cpu_s'] = time.process_time() - start_cpu
+            record['process_peak_rss_mb'] = peak_rss_mb()
+            if self.trace_memory:
+                # Peak of Python allocations made during this stage, above what was already allocated when it started
+                record['peak_traced_mb'] = (tracemalloc.get_traced_memory()[1] - traced_before) / (1024 * 1024)
+            if profiler is not None:
+                os.makedirs(self.profile_dir, exist_ok=True)
+                record['profile'] = os.path.join(self.profile_dir, f'{name}.prof')
+                profiler.dump_stats(record['profile'])
+            self.stages.append(record)
+
+    def summary(self, **run_info):
+        """
+        Returns the run summary as a JSON-serialisable dict
+        Input: any details of the run to include, e.g. the data path
+        """
+        return {
+            'started_at': self.started_at.isoformat(),
+            **run_info,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'total': {
+                'wall_s': time.perf_counter() - self.start_wall,
+                'cpu_s': time.process_time() - self.start_cpu,
+                'process_peak_rss_mb': peak_rss_mb(),
+            },
+            'stages': self.stages,
+        }
+
+    def write_summary(self, path, **run_info):
+        """
+        Writes the run summary as JSON
+        Input: the output path and any details of the run to include
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.summary(**run_info), f, indent=2)
@@ -0,0 +1,246 @@
+import hashlib
+import json
+
+import pandas as pd
+
+from cache import write_atomic
+
+# Rendered sections are kept next to the report with the hash of their inputs, so unchanged sections are not rendered again
+SECTION_CACHE_SUFFIX = '.sections.json'
+# Shared helpers the sections are rendered with. Their code is part of every section's hash, see render_version().
+RENDER_HELPERS = ['money', 'percent', 'plain', 'markdown_table']
+
+
+def money(values):
+    """
+    Returns a column of amounts formatted as U.S. dollars, e.g. $1,234.50
+    Input: a numeric column
+    """
+    return values.map('${:,.2f}'.format)
+
+
+def percent(values):
+    """
+    Returns a column of rates formatted as percentages, e.g. -1.36%
+    Input: a numeric column
+    """
+    return values.map('{:,.2f}%'.format)
+
+
+def plain(values):
+    """
+    Returns a column formatted as Python would print each value
+    Input: any column
+    """
+    return pd.Series(values.to_numpy(dtype=object), index=values.index).map(str)
+
+
+def markdown_table(columns, alignments):
+    """
+    Returns a Markdown table as one string, built a column at a time rather than a row at a time
+    Input: a dict of header to formatted (string) column, and the separator cell for each column, e.g. '----------:'
+    """
+    headers = list(columns)
+    lines = ['| ' + ' | '.join(headers) + ' |', '| ' + ' | '.join(alignments) + ' |']
+    # Each column is already formatted, so a row is only a join of ready-made strings
+    lines.extend('| ' + ' | '.join(cells) + ' |' for cells in zip(*(columns[header].tolist() for header in headers)))
+    return '\n'.join(lines) + '\n'
+
+
+def data_hash(*inputs):
+    """
+    Returns a hash of the data a section is rendered from
+    Input: any mix of DataFrames, Series and plain values
+    """
+    digest = hashlib.sha256()
+    for value in inputs:
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            digest.update(repr(value.dtypes if isinstance(value, pd.DataFrame) else value.dtype).encode('utf-8'))
+            digest.update(repr(list(value.columns) if isinstance(value, pd.DataFrame) else value.name).encode('utf-8'))
+            digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        else:
+            digest.update(repr(value).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def render_version():
+    """
+    Returns a hash of the rendering code: the source of this module and the helpers currently bound to the names in RENDER_HELPERS
+    """
+    digest = hashlib.sha256()
+    with open(__file__, 'rb') as f:
+        digest.update(f.read())
+    for name in RENDER_HELPERS:
+        helper = globals()[name]
+        code = getattr(helper, '__code__', None)
+        digest.update(repr((name, code.co_code, code.co_consts) if code is not None else (name, helper)).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def write_report(path, sections):
+    """
+    Renders the report from its sections and writes it, reusing the text of any section whose inputs have not changed since the last run
+    Input: the report path, and a list of (name, render function, inputs) where render(*inputs) returns the section text
+    """
+    cache_path = path + SECTION_CACHE_SUFFIX
+    try:
+        with open(cache_path) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+
+    texts = []
+    new_cache = {}
+    version = render_version()
+    for name, render, inputs in sections:
+        # The hash also covers the render function and the rendering code in this module (including the formatting helpers),
+        # so a change to either invalidates the section. Helpers defined elsewhere and called by a render function are not covered.
+        key = data_hash(version, render.__qualname__, render.__code__.co_code, render.__code__.co_consts, *inputs)
+        if name in cache and cache[name]['hash'] == key:
+            text = cache[name]['text']
+        else:
+            text = render(*inputs)
+        texts.append(text)
+        new_cache[name] = {'hash': key, 'text': text}
+
+    write_atomic(path, ''.join(texts))
+    write_atomic(cache_path, json.dumps(new_cache))
+
+
+def overview_section():
+    """
+    Returns the Overview and Data quality issues and wrangling sections of the report
+    """
+    return ''.join([
+        '# Overview\n\n',
+        'This study serves as a comparison between pricing data obtained from our local coffee shop and average pricing data for restaurant-sold coffee in the U.S.. The business insight to be gleaned from this therefore concerns how much the earnings made per year by the shop deviates from the nationwide average per year, which can be used to determine if prices are too high or too low compared to this average as a factor into critical business decisions.\n\n',
+        '# Data quality issues and wrangling\n\n',
+        'The products.csv file used for this study is stored in the /data directory of this project, and was read into the Python script and stored via Pandas, using its read_csv() function to convert it into a DataFrame object. \n\n',
+        'Wrangling the data involved reformatting it via the following steps:\n\n',
+        '- Refine our_price: Remove any non-numerical signs, then set any non-number value to the currently existing minimum numerical value.\n\n',
+        '- Refine current_stock: Set any non-number value to 0.\n\n',
+        '- Refine restock_threshold: Set any non-number value to the currently existing minimum numerical value.\n\n',
+        '- Refine restock_date: Convert to datetime and remove any rows with a NaN value.\n\n',
+        '- Refine category: This depends on product_name. Check if product_name contains certain words, then replace the category. The category is set to "coffee" for words such as "coffee", "bean", and "brew", and to "tea" for words such as "tea", "matcha", and "chai".\n\n',
+    ])
+
+
+def data_summary_section(inventory_df, inventory_categories_df):
+    """
+    Returns the Data summary section of the report
+    Input: the inventory after unit conversion and the per-category totals
+    """
+    inventory_table = markdown_table({
+        'Product Name': plain(inventory_df['product_name']),
+        'Our Price': money(inventory_df['our_price']),
+        'Category': plain(inventory_df['category']),
+        'Current Stock': plain(inventory_df['current_stock']),
+        'Restock Threshold': plain(inventory_df['restock_threshold']),
+        'Restock Date': plain(inventory_df['restock_date']),
+        'Price Per Restock': money(inventory_df['earnings_per_restock']),
+        'Weight Per Restock (lbs)': plain(inventory_df['weight_per_restock']),
+    }, ['----------:'] * 8)
+    categories_table = markdown_table({
+        'Category': plain(inventory_categories_df['Category']),
+        'Number of Products': plain(inventory_categories_df['Number of Products']),
+        'Cumulative Price (U.S.D.) Per Pound': money(inventory_categories_df['Price Per Pound']),
+    }, ['----------:'] * 3)
+    return ''.join([
+        '# Data summary\n\n',
+        'The processed data post-wrangling is shown:\n\n',
+        inventory_table,
+        "\n",
+        'The different categories of beverage and the number of products sold under each are as follows:\n\n',
+        categories_table,
+        "\n",
+    ])
+
+
+def external_data_section(in2013dollars_df):
+    """
+    Returns the External data integration section of the report
+    Input: the in2013dollars.com price series
+    """
+    price_table = markdown_table({
+        'Year': plain(in2013dollars_df['Year'].astype('int64')),
+        'U.S.D. Value': money(in2013dollars_df['U.S.D. Value']),
+        'Inflation Rate': percent(in2013dollars_df['Inflation Rate']),
+    }, ['----:', '----------:', '----------:'])
+    return ''.join([
+        '# External data integration\n\n',
+        'Our external source is in2013dollars.com, and specifically their free dataset of national average prices across all U.S. cities for <i>beverage materials including coffee and tea</i> from 1997 to 2024. This will allow us to obtain the average annual price in U.S.D. for beverages overall. The site is also one of the few such databases that can be freely webscraped and since it cites the U.S. Bureau of Labor Statistics as the source for its data, it can be assumed that said data is reasonably accurate. We will select data for the most recent year, in this case 2024 (the most recent full year as of this study).\n\n',
+        'Webscraping was done with lxml, which enabled extraction of the HTML table and refinement of the external data to remove HTML formatting and preserve the numerical values for the Year, U.S.D. Value, and Inflation Rate.\n\n',
+        price_table,
+        '\n\n',
+        'Source URL: https://www.in2013dollars.com/Beverage-materials-including-coffee-and-tea/price-inflation\n\n',
+    ])
+
+
+def business_insights_section(beverage_earnings_per_pound, beverage_total_per_year, beverage_average_price, beverage_total_price):
+    """
+    Returns the Business insights section of the report
+    Input: the local earnings per pound and per year, and the national average price per pound and expenses per year
+    """
+    return ''.join([
+        '# Business insights\n\n',
+        'For our economic insight, we compared the total per-pound price of all beverages for this store with the prices per pound per year. This allowed us to determine the difference between the yearly earnings by beverages sold at our shop and the yearly beverage prices per pound. This can be important to know when it comes to determining how to increase customer inflow; if we are above average, customers may not be willing to buy from us as often as with other stores.\n\n',
+        '## Inventory earnings per year\n\n',
+        'For calculation simplicity, the restock threshold is assumed to indicate how much of each product will be purchased per month, and we will also assume that every single unit we receive is sold before the end of the year.\n\n',
+        'To obtain the pound-weight for each item, the numerical quantity per unit is extracted from each product name (column "product_name"). If this number is absent, the product is assumed to be sold at a rate of 1 pound per package.\n\n',
+        'Should quantity per unit be present in the product name, it will be converted into pounds per unit; the program checks what unit the item is sold in, and if the amount of an item per package is in pounds then that amount will be used in subsequent calculations as-is. If the item is sold in ounces, the number of ounces per package is divided by 16 to obtain the pounds per package. For tea bags, a pound of tea leaves is assumed to be equivalent to 200 bags, so the amount of bags is divided by 200 to obtain the pound weight. Once the pound-weights per unit for all items are obtained, we multiply the price for each item by its restock threshold to get price per monthly restock, and the pound-weight for each item by its restock threshold to get quantity per monthly restock.\n\n',
+        'We then extract the sum of all prices per monthly restock for all items and multiply this by twelve months to get the total supply price per year for all beverage items put together. Thus, we have:\n\n',
+        'Local beverage earnings per pound: <b>${:,.2f}</b>\n\n'.format(beverage_earnings_per_pound),
+        'Finally, we multiply the monthly beverage earnings by twelve months to get the earnings per year, assuming all stock is sold before the end of the year:\n\n',
+        'Local beverage earnings per year: <b>${:,.2f}</b>\n\n'.format(beverage_total_per_year),
+        '## Average U.S. beverage price per year\n\n',
+        'For these calculations, assume that the national average is for each pound-unit of any beverage ingredient sold in any U.S. city. From the webscraped in2013dollars.com dataset, we extract the average beverage price from the year 2024 to get:\n\n',
+        'National average price per pound (2024): <b>${:,.2f}</b>\n\n'.format(beverage_average_price),
+        'Multiplying this by the total beverage weight and by twelve months, we obtain the expenses per year if we buy all our beverage ingredients at national average price:\n\n',
+        'Total expenses based on average ingredient price: <b>${:,.2f}</b>\n\n'.format(beverage_total_price),
+        'The price at which our goods are sold is thus, on average, below the average price of all beverages in all U.S. cities. However, this would also mean that if we were to buy our inventory at the average national price as per the current rate, we would be at a deficit because even the lowest average beverage price within the last two decades, at $19.26 in 2002, is still over a dollar above our average beverage price.\n\n',
+    ])
+
+
+def recommendations_section(deficit_per_year):
+    """
+    Returns the Future recommendations section of the report
+    Input: the yearly deficit of buying at the national average price
+    """
+    return ''.join([
+        '# Future recommendations\n\n',
+        'As noted above, on average we sell our beverages at a price below the national average, which has the benefit of attracting customers who would be more interested in saving money by purchasing from a seller whose price offerings are lower, but assuming that we buy inventory strictly at the national average rate, and assuming that rate is per pound of beverage ingredient, we will be facing a deficit of <b>${:,.2f}</b> per year (based on the national average in 2024). However, prices for individual beverage ingredients vary in the same way as those of our goods do depending on the type of beverage being purchased. To better match expenses to earnings and potentially turn a profit, we would need to find a choice or selection of vendors for each drink type that offer ingredients at the lowest price possible while still maintaining sufficient ingredient quality (since a higher-quality product will also be good for sales).\n\n'.format(deficit_per_year),
+        'The other recommendation for profit increase, assuming lower-price vendors are unavailable and/or quality cannot be sacrificed, would be to offer our goods at higher prices, bringing the average earning price per pound of ingredient closer to the national average. This is more risky if the lower prices are the primary reason for customers wanting to buy from us in the first place, but if we can find higher-quality vendors for ingredients to improve the goods themselves, then the price increase may be worth the additional investment due to better public standing improving business as much as lower prices. However, selecting higher-quality vendors may also run the risk of the expenses being increased in turn due to having to spend more to afford the ingredients they have on offer.\n\n',
+        'As such, the recommendations are largely dependent on whether or not we can find vendors that offer the same quality of product at a lower cost to us:\n\n',
+        '- If vendors that sell ingredients of an acceptable quality at lower prices exist, change the vendors to the option that reduces expenses, and potentially increase the restock threshold to offer more of the product to customers.\n\n',
+        '- If there are no vendors that can provide ingredients below the national average, instead raise the prices of the goods we sell, but also look for vendors that provide higher-quality versions of these items. In this way, we can make a trade-off between attracting customers with our current lower prices and bolstering our PR among the consumer base with higher-quality purchases.\n\n',
+        '(c) Adrian Tan, 2025\n\n',
+    ])
+
+
+def metrics_section(stage_metrics):
+    """
+    Returns the Run metrics section of the report
+    Input: the stage records from instrument.StageRecorder
+    """
+    metrics_df = pd.DataFrame(stage_metrics, columns=['stage', 'rows', 'wall_s', 'cpu_s', 'process_peak_rss_mb', 'peak_traced_mb'])
+    def megabytes(value):
+        return '' if value is None or pd.isna(value) else '{:,.1f}'.format(value)
+
+    columns = {
+        'Stage': plain(metrics_df['stage']),
+        'Rows': metrics_df['rows'].map(lambda rows: '' if rows is None or pd.isna(rows) else '{:,}'.format(int(rows))),
+        'Wall Time (s)': metrics_df['wall_s'].map('{:,.3f}'.format),
+        'CPU Time (s)': metrics_df['cpu_s'].map('{:,.3f}'.format),
+        'Process Peak RSS (MB)': metrics_df['process_peak_rss_mb'].map(megabytes),
+    }
+    # The stage's own peak is only known when the run traced its allocations (--trace-memory)
+    if metrics_df['peak_traced_mb'].notna().any():
+        columns['Stage Peak Traced (MB)'] = metrics_df['peak_traced_mb'].map(megabytes)
+    metrics_table = markdown_table(columns, [':---'] + ['----------:'] * (len(columns) - 1))
+    return ''.join([
+        '# Run metrics\n\n',
+        'Time and rows processed of each stage of the run that generated this report. Process Peak RSS is the highest resident memory of the whole process by the end of the stage, so it never goes down; Stage Peak Traced, when shown, is the peak of the Python allocations made during the stage itself:\n\n',
+        metrics_table,
+        '\n',
+    ])
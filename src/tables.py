@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+from lxml import etree
+
+PRICE_TABLE_COLUMNS = ['Year', 'U.S.D. Value', 'Inflation Rate']
+FEED_SIZE = 16 * 1024  # Characters fed to the parser at a time
+
+
+def first_table(html):
+    """
+    Returns the first top-level table element of an HTML page, or None
+    Input: the HTML of the page
+    """
+    # Parse incrementally and stop as soon as the first table is complete, so the rest of the page is never parsed
+    parser = etree.HTMLPullParser(events=('end',), tag='table')
+    for start in range(0, len(html), FEED_SIZE):
+        parser.feed(html[start:start + FEED_SIZE])
+        for _, element in parser.read_events():
+            # A table nested inside another ends first; wait for the outer one
+            if next(element.iterancestors('table'), None) is None:
+                return element
+    parser.close()
+    for _, element in parser.read_events():
+        if next(element.iterancestors('table'), None) is None:
+            return element
+    return None
+
+
+def parse_rate(text):
+    """
+    Returns an inflation rate such as "-1.36%" or "0.39%*" as a float
+    Input: the text of a table data cell
+    """
+    try:
+        return float(text.replace('%', '').replace('*', ''))
+    except ValueError:
+        # The rate is missing (shown without digits) for the first year of the series, so count it as 0%
+        return 0.0
+
+
+def parse_price_table(html):
+    """
+    Returns the first table of an in2013dollars.com price inflation page as a DataFrame with Year, U.S.D. Value and Inflation Rate
+    Input: the HTML of the page
+    """
+    table = first_table(html)
+    if table is None:
+        raise ValueError('The page does not contain a table')
+
+    # Header rows hold th cells; every other row holds one year of the series
+    rows = [[cell.xpath('string()').strip() for cell in row.iterchildren('td')] for row in table.xpath('.//tr[not(th)][count(td) >= 3]')]
+
+    return pd.DataFrame({
+        'Year': np.array([int(cells[0]) for cells in rows], dtype=np.int64),
+        'U.S.D. Value': np.array([float(cells[1].replace('$', '').replace(',', '')) for cells in rows], dtype=np.float64),
+        'Inflation Rate': np.array([parse_rate(cells[2]) for cells in rows], dtype=np.float64),
+    }, columns=PRICE_TABLE_COLUMNS)
@@ -0,0 +1,58 @@
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+# The unit table maps each unit name (lowercase) to how many of that unit make up one pound.
+# Add new units to config/units.json; no code changes are needed.
+DEFAULT_UNIT_TABLE_PATH = os.path.join(os.path.dirname(__file__), '..', 'config', 'units.json')
+
+
+def load_unit_table(path=DEFAULT_UNIT_TABLE_PATH):
+    """
+    Returns the unit conversion table as a dict of unit name to units per pound
+    Input: the path of a JSON file mapping unit names to units per pound
+    """
+    with open(path) as f:
+        table = json.load(f)
+    return {str(unit).lower(): float(per_pound) for unit, per_pound in table.items()}
+
+
+def unit_pattern(unit_table):
+    """
+    Returns a regex matching a quantity directly followed by a known unit, e.g. "(1lb)", "(50 bags)" or "(12oz)"
+    Input: the unit table from load_unit_table()
+    """
+    # Longest units first so that "lbs" is preferred over "lb"
+    units = sorted(unit_table, key=len, reverse=True)
+    return r'(?i)(\d+(?:\.\d+)?)\s*(' + '|'.join(re.escape(unit) for unit in units) + r')\b'
+
+
+def convert_units(inventory_df, unit_table=None):
+    """
+    Adds unit_number, pounds_per_unit, earnings_per_restock and weight_per_restock to the inventory
+    Input: the cleaned inventory DataFrame, and optionally a unit table from load_unit_table()
+    """
+    if unit_table is None:
+        unit_table = load_unit_table()
+
+    # Extract the quantity and its unit once per distinct product_name, since catalogs repeat names heavily
+    codes, names = pd.factorize(inventory_df['product_name'])
+    extracted = pd.Series(names, dtype='object').str.extract(unit_pattern(unit_table))
+
+    # Look up how many units make a pound. If the unit is absent or unknown, assume the product is sold in batches of 1 pound.
+    units_per_pound = extracted[1].str.lower().map(unit_table).astype('float64')
+    unit_number = pd.to_numeric(extracted[0], errors='coerce')
+    pounds_per_unit = (unit_number / units_per_pound).fillna(1.0).to_numpy()
+
+    # Broadcast the per-name results back to every row. Rows without a product_name have code -1, which picks the trailing default.
+    inventory_df['unit_number'] = np.append(extracted[0].to_numpy(dtype=object), np.nan)[codes]
+    inventory_df['pounds_per_unit'] = np.append(pounds_per_unit, 1.0)[codes]
+
+    # Multiply each our_price by restock_threshold to get earnings_per_restock, and each pounds_per_unit by restock_threshold to get weight_per_restock
+    inventory_df['earnings_per_restock'] = inventory_df['our_price'] * inventory_df['restock_threshold']
+    inventory_df['weight_per_restock'] = inventory_df['pounds_per_unit'] * inventory_df['restock_threshold']
+
+    return inventory_df